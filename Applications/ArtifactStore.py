@@ -0,0 +1,177 @@
+import json
+import os
+import threading
+import numpy as np
+import soundfile as sf
+from Applications.AudioBuffer import AudioBuffer
+
+class ArtifactStore:
+    """
+    Almacén de artefactos intermedios: float32 crudo intercalado (muestras, canales) más una cabecera JSON.
+    El archivo crudo se abre con memmap, de modo que leer cualquier rango de tiempo es una única lectura contigua.
+    """
+    VERSION = 1
+
+    def __init__(self, root_path, block_seconds=1.0):
+        self.root_path = root_path
+        self.block_seconds = block_seconds
+        self._memmaps = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.root_path, exist_ok=True)
+
+    def _paths(self, name):
+        return os.path.join(self.root_path, f"{name}.f32"), os.path.join(self.root_path, f"{name}.json")
+
+    def save(self, name, audio_buffer):
+        """
+        Guarda un AudioBuffer como artefacto.
+
+        Args:
+            name (str): Nombre del artefacto.
+            audio_buffer (AudioBuffer): Audio a guardar.
+
+        Returns:
+            dict: Cabecera del artefacto.
+        """
+        raw_path, _ = self._paths(name)
+        interleaved = np.ascontiguousarray(audio_buffer.data.T)
+        interleaved.tofile(raw_path)
+        return self._write_header(name, audio_buffer.sample_rate, audio_buffer.channels, *self._block_stats(interleaved, audio_buffer.sample_rate))
+
+    def import_file(self, name, audio_path):
+        """
+        Convierte un archivo de audio en artefacto leyéndolo por bloques, sin cargarlo completo en memoria.
+
+        Args:
+            name (str): Nombre del artefacto.
+            audio_path (str): Ruta al archivo de audio.
+
+        Returns:
+            dict: Cabecera del artefacto.
+        """
+        raw_path, _ = self._paths(name)
+        try:
+            with sf.SoundFile(audio_path) as source:
+                block_frames = max(1, int(self.block_seconds * source.samplerate))
+                rms, peak = [], []
+                with open(raw_path, "wb") as f:
+                    for block in source.blocks(blocksize=block_frames, dtype="float32", always_2d=True):
+                        block.tofile(f)
+                        block_rms, block_peak = self._block_stats(block, source.samplerate)
+                        rms.extend(block_rms)
+                        peak.extend(block_peak)
+                return self._write_header(name, source.samplerate, source.channels, rms, peak)
+        except RuntimeError:
+            # Formatos no soportados por libsndfile (MP3, M4A...): se decodifican completos una sola vez
+            return self.save(name, AudioBuffer.from_file(audio_path))
+
+    def _block_stats(self, interleaved, sample_rate):
+        block_frames = max(1, int(self.block_seconds * sample_rate))
+        full_blocks = len(interleaved) // block_frames
+        blocks = []
+        if full_blocks:
+            blocks.append(interleaved[:full_blocks * block_frames].reshape(full_blocks, -1))
+        # El último bloque puede ser parcial; se calcula aparte para no rellenar con ceros
+        if len(interleaved) > full_blocks * block_frames:
+            blocks.append(interleaved[full_blocks * block_frames:].reshape(1, -1))
+        rms, peak = [], []
+        for block in blocks:
+            rms.extend(np.sqrt(np.mean(np.square(block, dtype=np.float64), axis=1)).tolist())
+            peak.extend(np.abs(block).max(axis=1).tolist())
+        return rms, peak
+
+    def _write_header(self, name, sample_rate, channels, rms, peak):
+        raw_path, header_path = self._paths(name)
+        header = {
+            "version": self.VERSION,
+            "dtype": "float32",
+            "layout": "interleaved",
+            "sample_rate": int(sample_rate),
+            "channels": int(channels),
+            "frames": os.path.getsize(raw_path) // (4 * channels),
+            "block_seconds": self.block_seconds,
+            "block_rms": [float(value) for value in rms],
+            "block_peak": [float(value) for value in peak],
+        }
+        with open(header_path, "w") as f:
+            json.dump(header, f)
+        with self._lock:
+            self._memmaps.pop(name, None)
+        return header
+
+    def info(self, name):
+        """
+        Obtiene la cabecera de un artefacto.
+
+        Args:
+            name (str): Nombre del artefacto.
+
+        Returns:
+            dict: Cabecera del artefacto.
+        """
+        return self._open(name)[0]
+
+    def _open(self, name):
+        with self._lock:
+            if name not in self._memmaps:
+                raw_path, header_path = self._paths(name)
+                with open(header_path) as f:
+                    header = json.load(f)
+                if header["frames"]:
+                    data = np.memmap(raw_path, dtype=np.float32, mode="r", shape=(header["frames"], header["channels"]))
+                else:
+                    # mmap no admite archivos vacíos
+                    data = np.zeros((0, header["channels"]), dtype=np.float32)
+                self._memmaps[name] = (header, data)
+            return self._memmaps[name]
+
+    def read(self, name, start=0.0, end=None):
+        """
+        Lee un rango de tiempo de un artefacto sin leer el resto del archivo.
+
+        Args:
+            name (str): Nombre del artefacto.
+            start (float): Inicio del rango en segundos.
+            end (float): Fin del rango en segundos. None lee hasta el final.
+
+        Returns:
+            AudioBuffer: Audio del rango solicitado.
+        """
+        header, data = self._open(name)
+        start_frame = max(0, int(round(start * header["sample_rate"])))
+        end_frame = header["frames"] if end is None else min(header["frames"], int(round(end * header["sample_rate"])))
+        return AudioBuffer(data[start_frame:end_frame].T, header["sample_rate"])
+
+    def export_range(self, name, start, end, output_path, subtype="PCM_16"):
+        """
+        Escribe un rango de tiempo de un artefacto en un archivo de audio.
+
+        Args:
+            name (str): Nombre del artefacto.
+            start (float): Inicio del rango en segundos.
+            end (float): Fin del rango en segundos.
+            output_path (str): Ruta del archivo de salida.
+            subtype (str): Subtipo de soundfile. Por defecto, PCM de 16 bits.
+
+        Returns:
+            str: Ruta del archivo guardado.
+        """
+        header, data = self._open(name)
+        start_frame = max(0, int(round(start * header["sample_rate"])))
+        end_frame = min(header["frames"], int(round(end * header["sample_rate"])))
+        # Se escribe directamente desde el memmap, sin copias intermedias al formato canónico
+        sf.write(output_path, data[start_frame:end_frame], header["sample_rate"], subtype=subtype)
+        return output_path
+
+    def delete(self, name):
+        """
+        Elimina un artefacto del almacén.
+
+        Args:
+            name (str): Nombre del artefacto.
+        """
+        with self._lock:
+            self._memmaps.pop(name, None)
+        for path in self._paths(name):
+            if os.path.exists(path):
+                os.remove(path)
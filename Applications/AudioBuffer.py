@@ -0,0 +1,156 @@
+from math import gcd
+import numpy as np
+import soundfile as sf
+from pydub import AudioSegment
+
+class AudioBuffer:
+    """
+    Formato interno canónico del audio: float32 contiguo, canales primero (canales, muestras) y tasa de muestreo conocida.
+    """
+    def __init__(self, data, sample_rate):
+        data = np.asarray(data, dtype=np.float32)
+        if data.ndim == 1:
+            data = data[np.newaxis, :]
+        self.data = np.ascontiguousarray(data)
+        self.sample_rate = int(sample_rate)
+
+    @property
+    def channels(self):
+        return self.data.shape[0]
+
+    @property
+    def frames(self):
+        return self.data.shape[1]
+
+    @property
+    def duration(self):
+        return self.frames / self.sample_rate
+
+    @classmethod
+    def from_file(cls, audio_path):
+        """
+        Carga un archivo de audio conservando su tasa de muestreo y sus canales nativos.
+
+        Args:
+            audio_path (str): Ruta al archivo de audio.
+
+        Returns:
+            AudioBuffer: Audio cargado.
+        """
+        try:
+            data, sample_rate = sf.read(audio_path, dtype="float32", always_2d=True)
+            return cls(data.T, sample_rate)
+        except RuntimeError:
+            # Formatos no soportados por libsndfile (MP3, M4A...)
+            return cls.from_segment(AudioSegment.from_file(audio_path))
+
+    @classmethod
+    def from_segment(cls, audio):
+        """
+        Convierte un AudioSegment de pydub al formato canónico.
+
+        Args:
+            audio (AudioSegment): Audio cargado con pydub.
+
+        Returns:
+            AudioBuffer: Audio convertido.
+        """
+        return cls(cls.segment_samples(audio).T, audio.frame_rate)
+
+    @staticmethod
+    def segment_samples(audio):
+        """
+        Convierte un AudioSegment de pydub en un arreglo float32 contiguo de forma (muestras, canales) normalizado a [-1, 1].
+
+        Args:
+            audio (AudioSegment): Audio cargado con pydub.
+
+        Returns:
+            ndarray: Muestras del audio.
+        """
+        samples = np.array(audio.get_array_of_samples(), dtype=np.float32).reshape(-1, audio.channels)
+        samples /= float(1 << (8 * audio.sample_width - 1))
+        return samples
+
+    @staticmethod
+    def frame_energy(samples, sample_rate, frame_ms=10):
+        """
+        Calcula la energía RMS de cada trama del audio de forma vectorizada.
+
+        Args:
+            samples (ndarray): Muestras del audio de forma (muestras, canales).
+            sample_rate (int): Tasa de muestreo del audio.
+            frame_ms (int): Tamaño de la trama en milisegundos.
+
+        Returns:
+            ndarray: Energía RMS de cada trama; vacío si el audio es más corto que una trama.
+        """
+        frame_length = max(1, sample_rate * frame_ms // 1000)
+        num_frames = len(samples) // frame_length
+        if num_frames == 0:
+            return np.zeros(0, dtype=np.float32)
+        frames = samples[:num_frames * frame_length].reshape(num_frames, -1)
+        return np.sqrt(np.mean(np.square(frames), axis=1))
+
+    def resample(self, sample_rate):
+        """
+        Cambia la tasa de muestreo con un filtro polifásico. No hace nada si la tasa ya coincide.
+
+        Args:
+            sample_rate (int): Tasa de muestreo objetivo.
+
+        Returns:
+            AudioBuffer: Audio con la tasa de muestreo objetivo.
+        """
+        if sample_rate is None or sample_rate == self.sample_rate:
+            return self
+        from scipy.signal import resample_poly
+        divisor = gcd(int(sample_rate), self.sample_rate)
+        data = resample_poly(self.data, sample_rate // divisor, self.sample_rate // divisor, axis=1)
+        return AudioBuffer(data, sample_rate)
+
+    def to_channels(self, channels):
+        """
+        Cambia el número de canales. No hace nada si ya coincide.
+
+        Args:
+            channels (int): Número de canales objetivo.
+
+        Returns:
+            AudioBuffer: Audio con el número de canales objetivo.
+        """
+        if channels is None or channels == self.channels:
+            return self
+        mono = self.data.mean(axis=0, keepdims=True) if self.channels > 1 else self.data
+        return AudioBuffer(np.repeat(mono, channels, axis=0), self.sample_rate)
+
+    def conform(self, required_format):
+        """
+        Convierte el audio al formato que declara una etapa, omitiendo las conversiones innecesarias.
+
+        Args:
+            required_format (dict): Diccionario con "sample_rate" y "channels"; None en cualquiera de ellos acepta el valor actual.
+
+        Returns:
+            AudioBuffer: Audio en el formato requerido.
+        """
+        sample_rate = required_format.get("sample_rate")
+        channels = required_format.get("channels")
+        # Se reducen canales antes de remuestrear y se aumentan después para remuestrear el menor número de canales
+        if channels is not None and channels < self.channels:
+            return self.to_channels(channels).resample(sample_rate)
+        return self.resample(sample_rate).to_channels(channels)
+
+    def write(self, output_path, subtype="PCM_16"):
+        """
+        Guarda el audio en un archivo.
+
+        Args:
+            output_path (str): Ruta del archivo de salida.
+            subtype (str): Subtipo de soundfile. Por defecto, PCM de 16 bits.
+
+        Returns:
+            str: Ruta del archivo guardado.
+        """
+        sf.write(output_path, self.data.T, self.sample_rate, subtype=subtype)
+        return output_path
@@ -0,0 +1,141 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import ffmpeg
+import soundfile as sf
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".wma", ".m4a", ".ts", ".flac", ".ogg")
+
+class AudioProbe:
+    # Cachés LRU compartidas entre instancias, indexadas por ruta; cada entrada guarda el mtime (y el tamaño) con que se leyó
+    MAX_INFO_ENTRIES = 4096
+    MAX_LISTING_ENTRIES = 256
+    # Resolución de mtime que se asume para el sistema de archivos (FAT, montajes FUSE de Drive...). Un directorio
+    # modificado hace menos de esto puede cambiar sin que cambie su mtime, así que su listado no se guarda en caché.
+    MTIME_RESOLUTION_SECONDS = 2.0
+    _info_cache = OrderedDict()
+    _listing_cache = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, max_workers=8):
+        self.max_workers = max_workers
+
+    def probe(self, audio_path):
+        """
+        Obtiene los metadatos de un archivo de audio leyendo solo su cabecera.
+
+        Args:
+            audio_path (str): Ruta al archivo de audio.
+
+        Returns:
+            dict or None: Ruta, duración (s), tasa de muestreo, canales, número de muestras y formato; None si ocurrió un error.
+        """
+        try:
+            stat = os.stat(audio_path)
+            path = os.path.abspath(audio_path)
+            version = (stat.st_mtime_ns, stat.st_size)
+            info = self._cache_get(self._info_cache, path, version)
+            if info is None:
+                info = self._read_header(audio_path)
+                self._cache_put(self._info_cache, path, version, info, self.MAX_INFO_ENTRIES)
+            return info
+        except Exception as e:
+            print(f"Error al obtener los metadatos de {audio_path}: {e}")
+            return None
+
+    def _read_header(self, audio_path):
+        try:
+            # soundfile lee la cabecera sin decodificar (WAV, FLAC, OGG...)
+            info = sf.info(audio_path)
+            return {
+                "path": audio_path,
+                "duration": info.duration,
+                "sample_rate": info.samplerate,
+                "channels": info.channels,
+                "frames": info.frames,
+                "format": info.format,
+            }
+        except RuntimeError:
+            # Formatos no soportados por libsndfile (MP3, M4A, TS...): ffprobe también lee solo la cabecera
+            metadata = ffmpeg.probe(audio_path)
+            stream = next(s for s in metadata["streams"] if s["codec_type"] == "audio")
+            duration = float(stream.get("duration") or metadata["format"]["duration"])
+            sample_rate = int(stream["sample_rate"])
+            return {
+                "path": audio_path,
+                "duration": duration,
+                "sample_rate": sample_rate,
+                "channels": int(stream["channels"]),
+                "frames": int(round(duration * sample_rate)),
+                "format": metadata["format"]["format_name"],
+            }
+
+    def probe_many(self, audio_paths):
+        """
+        Obtiene los metadatos de varios archivos de audio de forma concurrente.
+
+        Args:
+            audio_paths (list): Rutas a los archivos de audio.
+
+        Returns:
+            list: Metadatos de cada archivo en el mismo orden, None para los que fallaron.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self.probe, audio_paths))
+
+    def total_duration(self, audio_paths):
+        """
+        Calcula la duración total de varios archivos de audio sin decodificarlos.
+
+        Args:
+            audio_paths (list): Rutas a los archivos de audio.
+
+        Returns:
+            float: Duración total en segundos.
+        """
+        return sum(info["duration"] for info in self.probe_many(audio_paths) if info)
+
+    def list_audio_files(self, directory, extensions=AUDIO_EXTENSIONS):
+        """
+        Lista los archivos de audio de un directorio en orden natural (segment_2 antes que segment_10).
+
+        Args:
+            directory (str): Directorio a listar.
+            extensions (tuple): Extensiones de archivo a incluir.
+
+        Returns:
+            list: Nombres de los archivos de audio.
+        """
+        stat = os.stat(directory)
+        path = os.path.abspath(directory)
+        recently_modified = time.time() - stat.st_mtime < self.MTIME_RESOLUTION_SECONDS
+        files = None if recently_modified else self._cache_get(self._listing_cache, path, stat.st_mtime_ns)
+        if files is None:
+            files = sorted((entry.name for entry in os.scandir(directory) if entry.is_file()), key=self._natural_key)
+            if not recently_modified:
+                self._cache_put(self._listing_cache, path, stat.st_mtime_ns, files, self.MAX_LISTING_ENTRIES)
+        return [file for file in files if file.lower().endswith(extensions)]
+
+    @classmethod
+    def _cache_get(cls, cache, path, version):
+        with cls._lock:
+            entry = cache.get(path)
+            if entry is None or entry[0] != version:
+                return None
+            cache.move_to_end(path)
+            return entry[1]
+
+    @classmethod
+    def _cache_put(cls, cache, path, version, value, max_entries):
+        with cls._lock:
+            cache[path] = (version, value)
+            cache.move_to_end(path)
+            while len(cache) > max_entries:
+                cache.popitem(last=False)
+
+    @staticmethod
+    def _natural_key(name):
+        return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", name)]
@@ -1,17 +1,27 @@
 from concurrent.futures import ThreadPoolExecutor
 import os
 import ffmpeg
-import librosa
 from pydub import AudioSegment
 import numpy as np
-import torch
-from scipy.signal import butter, filtfilt
-import soundfile as sf
-from numba import prange, jit
+from Applications.AudioBuffer import AudioBuffer
+from Applications.AudioProbe import AudioProbe
+from Applications.DatasetIndex import DatasetIndex
 
 class AudioProcessing:
+    # Formato que requiere enhance_audio; None acepta el valor nativo del archivo
+    ENHANCE_FORMAT = {"sample_rate": None, "channels": 1}
+
     def __init__(self):
-         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+         self._device = None
+         self.audio_probe = AudioProbe()
+
+    @property
+    def device(self):
+        # torch se importa solo cuando alguna etapa necesita el dispositivo
+        if self._device is None:
+            import torch
+            self._device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        return self._device
     
     def convert_to_mp3(self, input_audio_path, file):
         """
@@ -55,21 +65,24 @@ class AudioProcessing:
                 
             with ThreadPoolExecutor() as executor:
                 # Lista de archivos que deben convertirse a MP3
-                files_to_convert = [file for file in os.listdir(input_audio_path) if file.endswith(".ts") or file.endswith(".m4a")]
+                files_to_convert = self.audio_probe.list_audio_files(input_audio_path, (".ts", ".m4a"))
 
                 # Convierte los archivos a MP3 en paralelo
                 mp3_paths = list(executor.map(lambda f: self.convert_to_mp3(input_audio_path, f), files_to_convert))
                 # mp3_paths solo estará disponible si existen archivos tipo .ts o .m4a
                 
+            audio_paths = [os.path.join(input_audio_path, file) for file in self.audio_probe.list_audio_files(input_audio_path, (".mp3", ".wav", ".wma"))]
+            # Conocer la duración total antes de decodificar permite planificar y mostrar el progreso
+            total_duration = self.audio_probe.total_duration(audio_paths)
+            print(f"Duración total de entrada: {total_duration:.2f} segundos en {len(audio_paths)} archivos")
+
             combined_audio = None
-            for file in os.listdir(input_audio_path):
-                audio_path = os.path.join(input_audio_path, file)
-                if file.endswith(".mp3") or file.endswith(".wav") or file.endswith(".wma"):
-                    audio = AudioSegment.from_file(audio_path)
-                    if combined_audio is None:
-                        combined_audio = audio
-                    else:
-                        combined_audio += audio
+            for audio_path in audio_paths:
+                audio = AudioSegment.from_file(audio_path)
+                if combined_audio is None:
+                    combined_audio = audio
+                else:
+                    combined_audio += audio
             
             if combined_audio:
                 combine_path = os.path.join(output_audio_path, filename)
@@ -81,7 +94,7 @@ class AudioProcessing:
             print(f"Error al combinar los archivos de audio: {e}")
             return None
     
-    def split_audio(self, input_audio_path, output_audio_path, time_ms=10000):
+    def split_audio(self, input_audio_path, output_audio_path, time_ms=10000, smart=False, min_ms=None, max_ms=None, frame_ms=10, num_threads=None, manifest=True):
         """
         Divide un archivo de audio en segmentos de duración específica.
 
@@ -89,6 +102,12 @@ class AudioProcessing:
             input_audio_path (str): Ruta al archivo de audio de entrada.
             output_audio_path (str): Directorio donde guardar los segmentos de audio divididos.
             time_ms (int): Duración de cada segmento en milisegundos. Por defecto, 10000 ms (10 segundos).
+            smart (bool): Si es True, corta en las pausas (tramas de menor energía) cercanas a time_ms en lugar de cortar en límites fijos.
+            min_ms (int): Duración mínima de un segmento en modo inteligente. Por defecto, la mitad de time_ms.
+            max_ms (int): Duración máxima de un segmento en modo inteligente. Por defecto, 1.5 veces time_ms.
+            frame_ms (int): Tamaño de la trama usada para calcular la energía, en milisegundos.
+            num_threads (int): Número de hilos para escribir los segmentos. None usa el valor por defecto de ThreadPoolExecutor.
+            manifest (bool): Si es True, genera un índice "manifest" (Parquet o CSV) con el desplazamiento y las métricas de calidad de cada segmento.
 
         Returns:
             str: Ruta al archivo de audio dvidido si se ejecutó correctamente, None si ocurrió un error.
@@ -99,27 +118,98 @@ class AudioProcessing:
                 
             audio = AudioSegment.from_file(input_audio_path)
             duration = len(audio)
-            start = 0
-            index = 1
-            while start < duration:
-                end = min(start + time_ms, duration)
-                segment = audio[start:end]
-                segment.export(os.path.join(output_audio_path, f"segment_{index}.wav"), format="wav")
-                start = end
-                index += 1
+            # Las muestras solo se necesitan para buscar pausas o calcular métricas; se mantienen (muestras, canales) y contiguas
+            samples = AudioBuffer.segment_samples(audio) if smart or manifest else None
+
+            if smart:
+                min_ms = time_ms // 2 if min_ms is None else min_ms
+                max_ms = int(time_ms * 1.5) if max_ms is None else max_ms
+                if time_ms <= 0 or min_ms < 0 or min_ms > max_ms:
+                    raise ValueError(f"Se requiere 0 <= min_ms <= max_ms y time_ms > 0 (time_ms={time_ms}, min_ms={min_ms}, max_ms={max_ms}).")
+                frame_energy = AudioBuffer.frame_energy(samples, audio.frame_rate, frame_ms)
+                cuts = self._find_cut_points(frame_energy, frame_ms, duration, time_ms, min_ms, max_ms)
+            else:
+                cuts = [(start, min(start + time_ms, duration)) for start in range(0, duration, time_ms)]
+
+            # Escribe cada segmento en paralelo y calcula sus métricas desde el buffer en memoria en la misma pasada
+            def export_segment(item):
+                index, (start, end) = item
+                filename = f"segment_{index}.wav"
+                audio[start:end].export(os.path.join(output_audio_path, filename), format="wav")
+                if not manifest:
+                    return None
+                segment_samples = samples[start * audio.frame_rate // 1000:end * audio.frame_rate // 1000]
+                return filename, start / 1000, DatasetIndex.compute_clip_stats(segment_samples, audio.frame_rate)
+
+            with ThreadPoolExecutor(max_workers=num_threads) as executor:
+                rows = list(executor.map(export_segment, enumerate(cuts, start=1)))
+
+            if manifest:
+                dataset_index = DatasetIndex()
+                for filename, offset, stats in rows:
+                    dataset_index.add(filename, offset, stats)
+                dataset_index.write(output_audio_path)
             
             return output_audio_path
         except Exception as e:
             print(f"Error al dividir el archivo de audio: {e}")
             return None
+
+    def _find_cut_points(self, frame_energy, frame_ms, duration, time_ms, min_ms, max_ms):
+        """
+        Elige los puntos de corte en las tramas de menor energía cercanas a la duración objetivo. El corte se coloca en el
+        centro de la pausa elegida y no en su borde, para no cortar pegado a la voz.
+
+        Args:
+            frame_energy (ndarray): Energía RMS de cada trama.
+            frame_ms (int): Tamaño de la trama en milisegundos.
+            duration (int): Duración total del audio en milisegundos.
+            time_ms (int): Duración objetivo de cada segmento en milisegundos.
+            min_ms (int): Duración mínima de un segmento en milisegundos.
+            max_ms (int): Duración máxima de un segmento en milisegundos.
+
+        Returns:
+            list: Lista de tuplas (inicio, fin) en milisegundos.
+        """
+        cuts = []
+        start = 0
+        while duration - start > max_ms:
+            # Ventana de corte válida; el límite superior evita dejar un último segmento más corto que min_ms
+            # y el inferior, un segmento vacío cuando min_ms es 0
+            lower = -(-(start + max(min_ms, frame_ms)) // frame_ms)
+            upper = min(start + max_ms, duration - min_ms) // frame_ms
+            candidates = np.arange(lower, min(upper, len(frame_energy) - 1) + 1)
+            if candidates.size == 0:
+                end = start + (duration - start) // 2
+            else:
+                # Penaliza la distancia a la duración objetivo para preferir pausas cercanas a time_ms
+                distance = np.abs(candidates * frame_ms - (start + time_ms)) / max_ms
+                score = (frame_energy[candidates] + 1e-6) * (1.0 + distance)
+                best = int(np.argmin(score))
+                # En una pausa todas las tramas tienen casi la misma energía; se extiende la pausa elegida
+                # a las tramas vecinas de energía similar y se corta en su centro
+                threshold = frame_energy[candidates[best]] * 1.5 + 1e-4
+                first = last = best
+                while first > 0 and frame_energy[candidates[first - 1]] <= threshold:
+                    first -= 1
+                while last < candidates.size - 1 and frame_energy[candidates[last + 1]] <= threshold:
+                    last += 1
+                end = int(candidates[(first + last) // 2]) * frame_ms
+            cuts.append((start, end))
+            start = end
+        if start < duration:
+            cuts.append((start, duration))
+        return cuts
         
-    def enhance_audio(self, input_audio_path, output_audio_path):
+    def enhance_audio(self, input_audio_path, output_audio_path, normalize=True):
         """
         Mejora la calidad de un archivo de audio mediante filtrado y normalización.
 
         Args:
             input_audio_path (str): Ruta al archivo de audio de entrada.
             output_audio_path (str): Ruta donde se guardará el archivo de audio mejorado.
+            normalize (bool): Si es False, omite la normalización y guarda el resultado en float32 para no recortarlo;
+                sirve para normalizar después varios fragmentos con el mismo pico.
 
         Returns:
             str or None: Ruta al archivo de audio mejorado si se ejecutó correctamente, None si ocurrió un error.
@@ -132,8 +222,9 @@ class AudioProcessing:
             if not os.path.exists(input_audio_path):
                 raise FileNotFoundError(f"No se encontró el archivo de audio de entrada '{input_audio_path}'.")
 
-            # Cargar el archivo de audio
-            audio_data, sample_rate = librosa.load(input_audio_path, sr=None)
+            # Cargar el archivo de audio en su formato nativo y convertirlo solo si enhance_audio lo requiere
+            audio_buffer = AudioBuffer.from_file(input_audio_path).conform(self.ENHANCE_FORMAT)
+            audio_data, sample_rate = audio_buffer.data[0], audio_buffer.sample_rate
             
             # Aplicar cancelación de eco adaptativa
             audio_data_no_echo = self.cancel_echo(audio_data, delay=100, mu=0.01)
@@ -142,12 +233,12 @@ class AudioProcessing:
             filtered_audio = self.low_pass_filter(audio_data_no_echo, sample_rate, cutoff_freq=5000)
             
             # Aplicar normalización de volumen
-            normalized_audio = self.normalize_volume(filtered_audio)
+            normalized_audio = self.normalize_volume(filtered_audio) if normalize else filtered_audio
             
             # Guardar el audio procesado
             output_filename = f"enhance_{os.path.basename(input_audio_path)}"
             output_path = os.path.join(output_audio_path, output_filename)
-            sf.write(output_path, normalized_audio, sample_rate)
+            AudioBuffer(normalized_audio, sample_rate).write(output_path, subtype="PCM_16" if normalize else "FLOAT")
             print(f"Finalizando {input_audio_path}")
             return output_path
 
@@ -176,12 +267,10 @@ class AudioProcessing:
         return self._subtract_echo(audio_data, echo, delay, mu)
     
     @staticmethod
-    @jit(parallel=True, nopython=True)
     def _subtract_echo(audio_data, echo, delay, mu):
-        for i in prange(delay, len(audio_data)):
-            audio_data[i] -= mu * echo[i-delay]
-
-        return audio_data
+        # numba se importa y compila (o carga desde la caché en disco) solo al usar el kernel
+        from Applications.NumbaKernels import subtract_echo
+        return subtract_echo(audio_data, echo, delay, mu)
         
     def low_pass_filter(self, audio_data, sample_rate, cutoff_freq=5000):
         """
@@ -195,6 +284,7 @@ class AudioProcessing:
         Returns:
             ndarray: Audio filtrado.
         """
+        from scipy.signal import butter, filtfilt
         nyquist_freq = 0.5 * sample_rate
         normal_cutoff = cutoff_freq / nyquist_freq
         b, a = butter(6, normal_cutoff, btype='low', analog=False)
@@ -217,7 +307,7 @@ class AudioProcessing:
         
     def get_audio_duration(self, audio_path):
         """
-        Obtiene la duración de un archivo de audio en segundos.
+        Obtiene la duración de un archivo de audio en segundos leyendo solo su cabecera.
 
         Args:
             audio_path (str): Ruta al archivo de audio.
@@ -226,9 +316,7 @@ class AudioProcessing:
             float: Duración del archivo de audio en segundos.
         """
         try:
-            audio = AudioSegment.from_file(audio_path)
-            duration_seconds = audio.duration_seconds
-            return duration_seconds
+            return self.audio_probe.probe(audio_path)["duration"]
         except Exception as e:
             print(f"Error al obtener la duración del archivo de audio: {e}")
             return None
\ No newline at end of file
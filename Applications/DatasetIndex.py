@@ -0,0 +1,156 @@
+import csv
+import os
+import numpy as np
+
+class DatasetIndex:
+    # pyarrow se importa al escribir o leer el índice: AudioProcessing importa este módulo y lo usan todas las etapas
+    COLUMNS = ["file", "offset", "duration", "rms", "loudness", "peak", "clipping_ratio", "snr"]
+
+    def __init__(self, columns=None):
+        self.columns = columns or {name: [] for name in self.COLUMNS}
+
+    @staticmethod
+    def compute_clip_stats(samples, sample_rate, frame_ms=10, clip_threshold=0.999):
+        """
+        Calcula las métricas de calidad de un segmento a partir de sus muestras en memoria.
+
+        Args:
+            samples (ndarray): Muestras float del segmento de forma (muestras, canales) en el rango [-1, 1].
+            sample_rate (int): Tasa de muestreo del segmento.
+            frame_ms (int): Tamaño de la trama usada para estimar el SNR, en milisegundos.
+            clip_threshold (float): Amplitud a partir de la cual una muestra se considera saturada.
+
+        Returns:
+            dict: Duración (s), RMS, sonoridad (dBFS), pico (dBFS), proporción de saturación y SNR estimado (dB).
+        """
+        eps = 1e-10
+        if samples.size == 0:
+            return {"duration": 0.0, "rms": 0.0, "loudness": -np.inf, "peak": -np.inf, "clipping_ratio": 0.0, "snr": 0.0}
+
+        abs_samples = np.abs(samples)
+        rms = float(np.sqrt(np.mean(np.square(samples))))
+        peak = float(abs_samples.max())
+
+        # SNR estimado: potencia de las tramas más fuertes frente al piso de ruido de las más débiles
+        frame_length = max(1, sample_rate * frame_ms // 1000)
+        num_frames = len(samples) // frame_length
+        if num_frames > 1:
+            frames = samples[:num_frames * frame_length].reshape(num_frames, -1)
+            frame_power = np.mean(np.square(frames), axis=1)
+            noise, signal = np.percentile(frame_power, [10, 90])
+            snr = float(10 * np.log10((signal + eps) / (noise + eps)))
+        else:
+            snr = 0.0
+
+        return {
+            "duration": len(samples) / sample_rate,
+            "rms": rms,
+            "loudness": float(20 * np.log10(rms + eps)),
+            "peak": float(20 * np.log10(peak + eps)),
+            "clipping_ratio": float(np.mean(abs_samples >= clip_threshold)),
+            "snr": snr,
+        }
+
+    def add(self, file, offset, stats):
+        """
+        Añade una fila al índice.
+
+        Args:
+            file (str): Nombre del archivo del segmento.
+            offset (float): Desplazamiento del segmento en el audio original, en segundos.
+            stats (dict): Métricas devueltas por compute_clip_stats.
+        """
+        row = dict(stats, file=file, offset=offset)
+        for name in self.COLUMNS:
+            self.columns[name].append(row[name])
+
+    def __len__(self):
+        return len(self.columns["file"])
+
+    def write(self, output_path, filename="manifest"):
+        """
+        Escribe el índice en formato Parquet si pyarrow está disponible, o CSV en caso contrario.
+
+        Args:
+            output_path (str): Directorio donde guardar el índice.
+            filename (str): Nombre del archivo sin extensión.
+
+        Returns:
+            str: Ruta al índice generado.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            pa = None
+        if pa is not None:
+            index_path = os.path.join(output_path, f"{filename}.parquet")
+            pq.write_table(pa.table(self.columns), index_path)
+        else:
+            index_path = os.path.join(output_path, f"{filename}.csv")
+            with open(index_path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(self.COLUMNS)
+                writer.writerows(zip(*(self.columns[name] for name in self.COLUMNS)))
+        return index_path
+
+    @classmethod
+    def load(cls, path):
+        """
+        Carga un índice generado por write.
+
+        Args:
+            path (str): Ruta al índice o al directorio del dataset que lo contiene.
+
+        Returns:
+            DatasetIndex: Índice cargado, o None si no existe.
+        """
+        if os.path.isdir(path):
+            for extension in (".parquet", ".csv"):
+                candidate = os.path.join(path, f"manifest{extension}")
+                if os.path.exists(candidate):
+                    path = candidate
+                    break
+            else:
+                return None
+
+        if path.endswith(".parquet"):
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("Se requiere pyarrow para leer índices Parquet.")
+            return cls(pq.read_table(path).to_pydict())
+
+        columns = {name: [] for name in cls.COLUMNS}
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                for name in cls.COLUMNS:
+                    columns[name].append(row[name] if name == "file" else float(row[name]))
+        return cls(columns)
+
+    def query(self, min_duration=None, max_duration=None, min_loudness=None, max_clipping=None, min_snr=None):
+        """
+        Filtra los segmentos del índice sin abrir los archivos de audio.
+
+        Args:
+            min_duration (float): Duración mínima en segundos.
+            max_duration (float): Duración máxima en segundos.
+            min_loudness (float): Sonoridad mínima en dBFS.
+            max_clipping (float): Proporción máxima de muestras saturadas.
+            min_snr (float): SNR mínimo estimado en dB.
+
+        Returns:
+            list: Nombres de los archivos que cumplen todos los criterios.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        conditions = [
+            ("duration", min_duration, np.greater_equal),
+            ("duration", max_duration, np.less_equal),
+            ("loudness", min_loudness, np.greater_equal),
+            ("clipping_ratio", max_clipping, np.less_equal),
+            ("snr", min_snr, np.greater_equal),
+        ]
+        for name, limit, compare in conditions:
+            if limit is not None:
+                mask &= compare(np.asarray(self.columns[name], dtype=float), limit)
+        return [file for file, keep in zip(self.columns["file"], mask) if keep]
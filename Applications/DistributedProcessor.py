@@ -0,0 +1,308 @@
+import multiprocessing
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+import numpy as np
+import soundfile as sf
+from Applications.ArtifactStore import ArtifactStore
+from Applications.AudioBuffer import AudioBuffer
+from Applications.AudioProcessing import AudioProcessing
+from Applications.WorkQueue import WorkQueue
+
+STAGES = ("voice", "noise", "silence", "enhance")
+
+class DistributedProcessor:
+    """
+    Procesamiento repartido entre varios nodos. El coordinador divide el audio combinado en fragmentos por rango de tiempo
+    y los encola en una cola SQLite dentro de job_path, que debe estar en un sistema de archivos compartido. Cada nodo ejecuta
+    trabajadores que reclaman fragmentos, los pasan por las etapas de Demiset y dejan el resultado en job_path. Por último,
+    el coordinador une los resultados en orden con un fundido cruzado en cada frontera. Las etapas que cambian la duración
+    (eliminación de silencios) o dependen de todo el audio (normalización) se aplican después de unir los fragmentos.
+    """
+    def __init__(self, job_path, lease_seconds=600):
+        self.job_path = job_path
+        self.lease_seconds = lease_seconds
+        self.artifact_store = ArtifactStore(os.path.join(job_path, "artifacts"))
+        self.outputs_path = os.path.join(job_path, "outputs")
+        os.makedirs(self.outputs_path, exist_ok=True)
+        self.queue = WorkQueue(os.path.join(job_path, "queue.sqlite"))
+        self.audio_processing = AudioProcessing()
+        self._stages = {}
+
+    def submit(self, input_audio_path, name="job", shard_seconds=600, search_seconds=5.0, stages=STAGES, noise_threshold=50, crossfade_ms=50):
+        """
+        Divide el audio en fragmentos y los encola con un identificador de trabajo nuevo. Las fronteras se colocan en la
+        trama de menor energía cercana a cada múltiplo de shard_seconds, para que el fundido cruzado caiga en una pausa.
+        Cada fragmento se extiende crossfade_ms más allá de su frontera para que el fundido mezcle el mismo audio.
+
+        Args:
+            input_audio_path (str): Ruta al archivo de audio combinado.
+            name (str): Prefijo del identificador del trabajo.
+            shard_seconds (float): Duración aproximada de cada fragmento en segundos.
+            search_seconds (float): Margen alrededor de cada frontera donde buscar la pausa, en segundos.
+            stages (tuple): Etapas a aplicar, en orden, entre "voice", "noise", "silence" y "enhance".
+            noise_threshold (int): Porcentaje de reducción de ruido para la etapa "noise".
+            crossfade_ms (int): Duración del fundido cruzado en milisegundos.
+
+        Returns:
+            str or None: Identificador del trabajo, None si ocurrió un error.
+        """
+        # Un identificador nuevo por envío evita mezclar fragmentos de ejecuciones anteriores en el mismo job_path
+        job = f"{name}_{time.strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        try:
+            if shard_seconds <= 0:
+                raise ValueError(f"shard_seconds debe ser positivo, se recibió {shard_seconds}")
+            header = self.artifact_store.import_file(job, input_audio_path)
+            duration = header["frames"] / header["sample_rate"]
+
+            # Distancia mínima entre fronteras, para que la búsqueda nunca retroceda ni deje fragmentos vacíos
+            min_gap = min(search_seconds, shard_seconds / 2)
+            boundaries = [0.0]
+            target = shard_seconds
+            while target < duration - min_gap:
+                start = max(target - search_seconds, boundaries[-1] + min_gap)
+                end = min(target + search_seconds, duration - min_gap)
+                boundaries.append(self._find_pause(job, target, start, end))
+                target = boundaries[-1] + shard_seconds
+            boundaries.append(duration)
+
+            # El fundido cruzado solo es correcto si los fragmentos conservan la duración y el nivel del audio de entrada:
+            # los silencios se eliminan y el volumen se normaliza después de unirlos
+            shard_stages = [stage for stage in stages if stage != "silence"]
+            post_stages = (["silence"] if "silence" in stages else []) + (["normalize"] if "enhance" in stages else [])
+            overlap = crossfade_ms / 1000
+            payloads = [
+                {
+                    "start": start,
+                    "end": min(end + overlap, duration),
+                    "stages": shard_stages,
+                    "post_stages": post_stages,
+                    "noise_threshold": noise_threshold,
+                    "crossfade_ms": crossfade_ms if end < duration else 0,
+                }
+                for start, end in zip(boundaries[:-1], boundaries[1:])
+            ]
+            self.queue.enqueue(job, payloads)
+            print(f"Trabajo {job}: {duration:.2f} segundos en {len(payloads)} fragmentos")
+            return job
+        except Exception as e:
+            print(f"Error al encolar el trabajo {job}: {e}")
+            return None
+
+    def _find_pause(self, job, target, start, end, frame_ms=10):
+        window = self.artifact_store.read(job, start, end)
+        frame_energy = AudioBuffer.frame_energy(window.data.T, window.sample_rate, frame_ms)
+        if frame_energy.size == 0:
+            return target
+        return start + int(np.argmin(frame_energy)) * frame_ms / 1000
+
+    def _get_stage(self, name):
+        # Las etapas se crean una sola vez por trabajador; VoiceExtractor carga el modelo al construirse
+        if name not in self._stages:
+            if name == "voice":
+                from Applications.VoiceExtractor import VoiceExtractor
+                self._stages[name] = VoiceExtractor()
+            elif name == "noise":
+                from Applications.NoiseReducer import NoiseReducer
+                self._stages[name] = NoiseReducer()
+            elif name == "silence":
+                from Applications.SilenceRemover import SilenceRemover
+                self._stages[name] = SilenceRemover()
+            else:
+                self._stages[name] = self.audio_processing
+        return self._stages[name]
+
+    def _run_stages(self, shard_path, work_path, payload):
+        current_path = shard_path
+        for name in payload["stages"]:
+            stage = self._get_stage(name)
+            if name == "voice":
+                current_path = stage.extract_vocals(current_path, work_path)
+            elif name == "noise" and payload["noise_threshold"] > 0:
+                current_path = stage.reduce_noise(current_path, work_path, payload["noise_threshold"])
+            elif name == "silence":
+                current_path = stage.remove_silence(current_path, work_path)
+            elif name == "enhance":
+                # Se normaliza al unir, con el pico de todo el audio
+                current_path = stage.enhance_audio(current_path, work_path, normalize=False)
+            if current_path is None:
+                raise RuntimeError(f"La etapa {name} no produjo resultado")
+        return current_path
+
+    def run_worker(self, job=None, worker_id=None, idle_timeout=0, poll_seconds=5):
+        """
+        Reclama y procesa fragmentos hasta que la cola se vacía.
+
+        Args:
+            job (str): Si se indica, solo se procesan fragmentos de ese trabajo.
+            worker_id (str): Identificador del trabajador. Por defecto, host, PID y un sufijo aleatorio.
+            idle_timeout (float): Segundos que se sigue esperando trabajo con la cola vacía antes de terminar.
+            poll_seconds (float): Intervalo entre consultas a la cola cuando está vacía.
+
+        Returns:
+            int: Número de fragmentos procesados.
+        """
+        worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        processed = 0
+        idle_since = time.time()
+        while True:
+            item = self.queue.claim(worker_id, self.lease_seconds, job)
+            if item is None:
+                if time.time() - idle_since >= idle_timeout:
+                    return processed
+                time.sleep(poll_seconds)
+                continue
+
+            # Renovar el arriendo mientras se procesa para que otro trabajador no reclame el fragmento
+            stop = threading.Event()
+            def renew_lease():
+                while not stop.wait(self.lease_seconds / 3):
+                    self.queue.renew(item["id"], worker_id, self.lease_seconds)
+            renewer = threading.Thread(target=renew_lease, daemon=True)
+            renewer.start()
+
+            payload = item["payload"]
+            work_path = os.path.join(self.job_path, "work", worker_id, f"{item['job']}_{item['position']}")
+            try:
+                os.makedirs(work_path, exist_ok=True)
+                shard_path = os.path.join(work_path, f"shard_{item['position']}.wav")
+                self.artifact_store.export_range(item["job"], payload["start"], payload["end"], shard_path)
+                result_path = self._run_stages(shard_path, work_path, payload)
+
+                # Se copia con un nombre temporal y se renombra para que el coordinador nunca vea un archivo a medias
+                output_path = os.path.join(self.outputs_path, f"{item['job']}_{item['position']}{os.path.splitext(result_path)[1]}")
+                shutil.copyfile(result_path, f"{output_path}.part")
+                os.replace(f"{output_path}.part", output_path)
+                peak = float(np.abs(AudioBuffer.from_file(result_path).data).max(initial=0.0))
+                result = {"path": os.path.relpath(output_path, self.job_path), "peak": peak}
+                if self.queue.complete(item["id"], worker_id, result):
+                    processed += 1
+            except Exception as e:
+                print(f"Error al procesar el fragmento {item['position']} del trabajo {item['job']}: {e}")
+                self.queue.fail(item["id"], worker_id, e)
+            finally:
+                stop.set()
+                renewer.join()
+                shutil.rmtree(work_path, ignore_errors=True)
+            idle_since = time.time()
+
+    def wait(self, job, poll_seconds=5, timeout=None):
+        """
+        Espera a que todos los fragmentos de un trabajo terminen.
+
+        Returns:
+            bool: True si todos terminaron correctamente, False si alguno falló o se agotó el tiempo.
+        """
+        start_time = time.time()
+        while True:
+            status = self.queue.status(job)
+            if status.get("failed"):
+                return False
+            if not status.get("pending") and not status.get("leased"):
+                return True
+            if timeout is not None and time.time() - start_time > timeout:
+                return False
+            time.sleep(poll_seconds)
+
+    def merge(self, job, output_audio_path, filename=None):
+        """
+        Une en orden los resultados de un trabajo con un fundido cruzado lineal en cada frontera, aplica las etapas que
+        deben ver el audio completo y elimina los archivos del trabajo. El fundido dura lo mismo que el solapamiento con
+        el que se encoló cada fragmento; como ambos lados son el mismo audio, un fundido lineal conserva su nivel.
+
+        Args:
+            job (str): Identificador del trabajo.
+            output_audio_path (str): Directorio donde guardar el audio unido.
+            filename (str): Nombre del archivo de salida. Por defecto, "<job>_merged.wav".
+
+        Returns:
+            str or None: Ruta al audio unido, None si faltan resultados u ocurrió un error.
+        """
+        try:
+            results = self.queue.results(job)
+            if not results or any(result is None for result in results):
+                print(f"El trabajo {job} tiene fragmentos sin terminar.")
+                return None
+            payloads = self.queue.payloads(job)
+            post_stages = payloads[0].get("post_stages", [])
+
+            os.makedirs(output_audio_path, exist_ok=True)
+            output_path = os.path.join(output_audio_path, filename or f"{job}_merged.wav")
+            # Si después se eliminan los silencios, la unión se escribe primero en el directorio del trabajo
+            merged_path = os.path.join(self.job_path, "work", f"{job}_merged.wav") if "silence" in post_stages else output_path
+            os.makedirs(os.path.dirname(merged_path), exist_ok=True)
+
+            # Todas las partes se llevan al formato de la primera
+            first = sf.info(os.path.join(self.job_path, results[0]["path"]))
+            output_format = {"sample_rate": first.samplerate, "channels": first.channels}
+            # Normalización con el pico de todo el audio, igual que en el procesamiento local
+            peak = max(result.get("peak", 0.0) for result in results)
+            gain = np.float32(1.0 / peak) if "normalize" in post_stages and peak > 0 else np.float32(1.0)
+
+            # Solo se mantiene en memoria un fragmento y la cola pendiente del anterior, que se solapa con su inicio
+            pending = None
+            with sf.SoundFile(merged_path, "w", samplerate=first.samplerate, channels=first.channels, subtype="PCM_16") as output:
+                for result, payload in zip(results, payloads):
+                    data = AudioBuffer.from_file(os.path.join(self.job_path, result["path"])).conform(output_format).data * gain
+                    if pending is not None:
+                        fade = min(pending.shape[1], data.shape[1])
+                        output.write(pending[:, :pending.shape[1] - fade].T)
+                        if fade:
+                            curve = np.linspace(0, 1, fade, dtype=np.float32)
+                            output.write((pending[:, pending.shape[1] - fade:] * (1 - curve) + data[:, :fade] * curve).T)
+                            data = data[:, fade:]
+                    keep = min(first.samplerate * payload.get("crossfade_ms", 0) // 1000, data.shape[1])
+                    output.write(data[:, :data.shape[1] - keep].T)
+                    pending = data[:, data.shape[1] - keep:]
+                if pending is not None:
+                    output.write(pending.T)
+
+            if "silence" in post_stages:
+                from Applications.SilenceRemover import SilenceRemover
+                silence_path = SilenceRemover().remove_silence(merged_path, output_audio_path)
+                os.remove(merged_path)
+                if silence_path is None:
+                    raise RuntimeError("La eliminación de silencios no produjo resultado")
+                os.replace(silence_path, output_path)
+
+            self.cleanup(job)
+            return output_path
+        except Exception as e:
+            print(f"Error al unir los fragmentos del trabajo {job}: {e}")
+            return None
+
+    def cleanup(self, job):
+        """
+        Elimina el artefacto de entrada y los resultados de un trabajo. Los elementos de la cola se conservan como historial.
+
+        Args:
+            job (str): Identificador del trabajo.
+        """
+        self.artifact_store.delete(job)
+        prefix = f"{job}_"
+        for name in os.listdir(self.outputs_path):
+            if name.startswith(prefix):
+                os.remove(os.path.join(self.outputs_path, name))
+
+def _run_local_worker(job_path, job, lease_seconds):
+    DistributedProcessor(job_path, lease_seconds).run_worker(job)
+
+def run_local_workers(job_path, num_workers, job=None, lease_seconds=600):
+    """
+    Lanza varios trabajadores como procesos locales y espera a que terminen.
+
+    Args:
+        job_path (str): Directorio del trabajo.
+        num_workers (int): Número de procesos trabajadores.
+        job (str): Si se indica, solo se procesan fragmentos de ese trabajo.
+        lease_seconds (float): Duración del arriendo en segundos.
+    """
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_run_local_worker, args=(job_path, job, lease_seconds)) for _ in range(num_workers)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
@@ -1,40 +1,120 @@
 
 import sys
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 sys.path.append(os.path.dirname(os.getcwd()))
 from Utils.Constants import RUTA_REMOTA, RUTA_LOCAL_ZIPS
-from pydrive2.auth import GoogleAuth
-from google.colab import auth
-from pydrive2.drive import GoogleDrive
-from oauth2client.client import GoogleCredentials
 from urllib.parse import urlparse, parse_qs
 from shutil import unpack_archive
 
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
 class GoogleDriveManager:
-    def __init__(self):
-        auth.authenticate_user()
-        gauth = GoogleAuth()
-        gauth.credentials = GoogleCredentials.get_application_default()
-        self.drive = GoogleDrive(gauth)
- 
+    def __init__(self, drive=None, max_workers=4, page_size=1000, chunksize=32 * 1024 * 1024, listing_ttl=300):
+        """
+        Args:
+            drive: Backend compatible con pydrive2.GoogleDrive. Si es None, se autentica con Google Colab.
+            max_workers (int): Número máximo de transferencias concurrentes.
+            page_size (int): Número de elementos por página al listar carpetas.
+            chunksize (int): Tamaño en bytes de cada bloque de descarga.
+            listing_ttl (float): Segundos durante los que se reutiliza el listado de una carpeta; los cambios hechos
+                en Drive desde fuera de esta instancia se ven como mucho tras este tiempo.
+        """
+        if drive is None:
+            from google.colab import auth
+            from pydrive2.auth import GoogleAuth
+            from pydrive2.drive import GoogleDrive
+            from oauth2client.client import GoogleCredentials
+            auth.authenticate_user()
+            gauth = GoogleAuth()
+            gauth.credentials = GoogleCredentials.get_application_default()
+            drive = GoogleDrive(gauth)
+        # pydrive2 usa un objeto HTTP por hilo, por lo que el mismo backend se puede compartir entre los hilos
+        self.drive = drive
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.chunksize = chunksize
+        self.listing_ttl = listing_ttl
+        # Caché de listados por (carpeta padre, es_carpeta) con la hora del listado, y de IDs por (carpeta padre, nombre, es_carpeta)
+        self._listing_cache = {}
+        self._id_cache = {}
+        self._lock = threading.Lock()
+
+    def _list_folder(self, parent_folder_id, is_folder=None, refresh=False):
+        """
+        Lista el contenido de una carpeta por páginas y memoiza el resultado durante listing_ttl segundos.
+
+        Args:
+            parent_folder_id (str): ID de la carpeta padre.
+            is_folder (bool): True solo carpetas, False solo archivos, None ambos.
+            refresh (bool): Si es True, vuelve a listar la carpeta aunque haya un listado en caché.
+
+        Returns:
+            list: Elementos de la carpeta.
+        """
+        key = (parent_folder_id, is_folder)
+        with self._lock:
+            cached = self._listing_cache.get(key)
+            if cached is not None and not refresh and time.monotonic() - cached[0] < self.listing_ttl:
+                return cached[1]
+
+        query = f"'{parent_folder_id}' in parents and trashed=false"
+        if is_folder is not None:
+            query += f" and mimeType = '{FOLDER_MIME_TYPE}'" if is_folder else f" and mimeType != '{FOLDER_MIME_TYPE}'"
+
+        items = []
+        for page in self.drive.ListFile({'q': query, 'maxResults': self.page_size}):
+            items.extend(page)
+
+        with self._lock:
+            self._listing_cache[key] = (time.monotonic(), items)
+            # Los IDs de la carpeta se reconstruyen desde el listado nuevo para olvidar los elementos borrados fuera
+            for id_key in [id_key for id_key in self._id_cache if id_key[0] == parent_folder_id and is_folder in (None, id_key[2])]:
+                del self._id_cache[id_key]
+            for item in items:
+                self._id_cache[(parent_folder_id, item['title'], item['mimeType'] == FOLDER_MIME_TYPE)] = item['id']
+        return items
+
+    def _remember(self, parent_folder_id, item):
+        # Mantiene las cachés al día tras crear o subir un elemento, sin volver a listar la carpeta
+        is_folder = item['mimeType'] == FOLDER_MIME_TYPE
+        with self._lock:
+            self._id_cache[(parent_folder_id, item['title'], is_folder)] = item['id']
+            for key in ((parent_folder_id, is_folder), (parent_folder_id, None)):
+                if key in self._listing_cache:
+                    listed_at, items = self._listing_cache[key]
+                    self._listing_cache[key] = (listed_at, [i for i in items if i['id'] != item['id']] + [item])
+
+    def _forget(self, folder_id):
+        # Invalida las cachés que contienen o describen la carpeta eliminada
+        with self._lock:
+            for key in [key for key in self._listing_cache if key[0] == folder_id]:
+                del self._listing_cache[key]
+            for key in [key for key, value in self._id_cache.items() if value == folder_id or key[0] == folder_id]:
+                del self._id_cache[key]
+            for key, (listed_at, items) in self._listing_cache.items():
+                self._listing_cache[key] = (listed_at, [item for item in items if item['id'] != folder_id])
+
     def get_folder_or_file_id(self, name, parent_folder_id=None, is_folder=True):
         try:
             if parent_folder_id is None:
                 parent_folder_id = "root"  # Usa "root" para referirte a la raíz de Google Drive
-                
-            query = f"'{parent_folder_id}' in parents and trashed=false"
-            query += " and mimeType = 'application/vnd.google-apps.folder'" if is_folder else " and mimeType != 'application/vnd.google-apps.folder'"
 
-            folder_list = self.drive.ListFile({'q': query}).GetList()
-            
-            for item in folder_list:
+            key = (parent_folder_id, name, is_folder)
+            with self._lock:
+                if key in self._id_cache:
+                    return self._id_cache[key]
+
+            for item in self._list_folder(parent_folder_id, is_folder):
                 if item['title'] == name:
                     return item['id']
-            
+
             return None
         except Exception as e:
             return None
-              
+
     def create_folder(self, folder_path, parent_folder_id=None):
         try:
             # Si la ruta comienza con '/', elimina ese carácter
@@ -42,13 +122,13 @@ class GoogleDriveManager:
                 folder_path = folder_path[1:]
 
             # Divide la ruta en partes
-            parts = folder_path.split('/')
+            parts = [part for part in folder_path.split('/') if part]
 
             current_parent_id = parent_folder_id
             for part_name in parts:
                 # Comprobar si ya existe una carpeta con el nombre de la parte actual
                 existing_folder_id = self.get_folder_or_file_id(part_name, current_parent_id, is_folder=True)
-                
+
                 if existing_folder_id:
                     # Si la carpeta ya existe, usamos su ID como padre para la siguiente parte
                     current_parent_id = existing_folder_id
@@ -56,7 +136,7 @@ class GoogleDriveManager:
                     # Crear metadatos de la carpeta
                     folder_metadata = {
                         'title': part_name,
-                        'mimeType': 'application/vnd.google-apps.folder'
+                        'mimeType': FOLDER_MIME_TYPE
                     }
 
                     if current_parent_id:
@@ -65,31 +145,39 @@ class GoogleDriveManager:
                     # Crear la carpeta
                     new_folder = self.drive.CreateFile(folder_metadata)
                     new_folder.Upload()
+                    self._remember(current_parent_id or "root", {'id': new_folder['id'], 'title': part_name, 'mimeType': FOLDER_MIME_TYPE})
                     current_parent_id = new_folder['id']  # Usar el ID de la nueva carpeta como padre para la siguiente parte
-            
+
             return current_parent_id  # Retorna el ID de la última carpeta creada o encontrada
         except Exception as e:
             print(f"Error: {e}")
             return None
 
+    def _upload_to_folder(self, local_file_path, folder_id, remote_file_name=None):
+        """
+        Sube un archivo a una carpeta mediante la subida reanudable por bloques de pydrive2.
+        Si ya existe un archivo con el mismo nombre y tamaño en la carpeta, se omite la subida.
+        """
+        title = remote_file_name or os.path.basename(local_file_path)
+        local_size = os.path.getsize(local_file_path)
+        for item in self._list_folder(folder_id, is_folder=False):
+            if item['title'] == title and int(item.get('fileSize', -1)) == local_size:
+                return item['id']
+
+        remote_file = self.drive.CreateFile({'title': title, 'parents': [{'id': folder_id}]})
+        remote_file.SetContentFile(local_file_path)
+        remote_file.Upload()
+        self._remember(folder_id, {'id': remote_file['id'], 'title': title, 'mimeType': remote_file.get('mimeType', ''), 'fileSize': str(local_size)})
+        return remote_file['id']
 
     def upload_file(self, local_file_path, folder_name, remote_file_name=None):
         try:
-            # Si el nombre de la carpeta comienza con '/', elimina ese carácter
-            if folder_name.startswith('/'):
-                folder_name = folder_name[1:]
-
-            # Filtra las cadenas vacías después de dividir la ruta
-            parts = [part for part in folder_name.split('/') if part]
-
             # Crear la carpeta si no existe
             current_parent_id = self.create_folder(folder_name)
 
             # Subir el archivo a la carpeta de destino
             if current_parent_id:
-                remote_file = self.drive.CreateFile({'title': remote_file_name or os.path.basename(local_file_path), 'parents': [{'id': current_parent_id}]})
-                remote_file.SetContentFile(local_file_path)
-                remote_file.Upload()
+                self._upload_to_folder(local_file_path, current_parent_id, remote_file_name)
                 return current_parent_id
             else:
                 print("Error al crear la carpeta.")
@@ -97,36 +185,116 @@ class GoogleDriveManager:
         except Exception as e:
             print(f"Error: {e}")
             return None
-    
+
+    def upload_files(self, local_file_paths, folder_name):
+        """
+        Sube varios archivos a la misma carpeta de forma concurrente.
+
+        Args:
+            local_file_paths (list): Rutas de los archivos locales.
+            folder_name (str): Ruta de la carpeta remota; se crea si no existe.
+
+        Returns:
+            str or None: ID de la carpeta remota si todos los archivos se subieron, None si ocurrió un error.
+        """
+        try:
+            current_parent_id = self.create_folder(folder_name)
+            if not current_parent_id:
+                print("Error al crear la carpeta.")
+                return None
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(lambda path: self._upload_to_folder(path, current_parent_id), local_file_paths))
+            return current_parent_id
+        except Exception as e:
+            print(f"Error: {e}")
+            return None
+
     def delete_folder(self, folder_id):
         try:
             # Obtén la lista de archivos dentro de la carpeta por su ID
             folder = self.drive.CreateFile({'id': folder_id})
-            archivo_list = self.drive.ListFile({'q': f"'{folder_id}' in parents and trashed=false"}).GetList()
+            archivo_list = self._list_folder(folder_id)
 
-            # Elimina cada archivo en la carpeta
-            for archivo in archivo_list:
-                file_id = archivo['id']
-                file_to_delete = self.drive.CreateFile({'id': file_id})
-                file_to_delete.Trash()
+            # Elimina los archivos de la carpeta de forma concurrente
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(lambda archivo: self.drive.CreateFile({'id': archivo['id']}).Trash(), archivo_list))
 
             # Elimina la carpeta
             folder.Trash()
+            self._forget(folder_id)
 
             return True
         except Exception as e:
             print(f"Error: {e}")
             return False
-        
+
     def delete_file(self, file_id):
         try:
             file_to_delete = self.drive.CreateFile({'id': file_id})
             file_to_delete.Trash()
+            self._forget(file_id)
             return True
         except Exception as e:
             print(f"Error: {e}")
             return False
 
+    def _download_file(self, archivo, local_folder_path):
+        """
+        Descarga un archivo por bloques a un archivo temporal ".part" y lo renombra al terminar.
+        Si el archivo local ya existe con el tamaño remoto, se omite la descarga; si queda un ".part" de un
+        intento anterior, se continúa desde su tamaño.
+        """
+        local_path = os.path.join(local_folder_path, archivo['title'])
+        remote_size = archivo.get('fileSize')
+        if remote_size is not None and os.path.exists(local_path) and os.path.getsize(local_path) == int(remote_size):
+            return local_path
+
+        partial_path = f"{local_path}.part"
+        offset = os.path.getsize(partial_path) if os.path.exists(partial_path) else 0
+        downloaded_file = self.drive.CreateFile({'id': archivo['id']})
+        if remote_size is not None and 0 < offset <= int(remote_size):
+            self._download_range(downloaded_file, partial_path, offset, int(remote_size))
+        else:
+            downloaded_file.GetContentFile(partial_path, chunksize=self.chunksize)
+        os.replace(partial_path, local_path)
+        return local_path
+
+    def _download_range(self, downloaded_file, partial_path, offset, total_size):
+        # GetContentFile de pydrive2 siempre descarga desde el byte 0, así que el resto del archivo se pide a la API
+        # de Drive por bloques con cabeceras Range. _WrapRequest asigna el objeto HTTP del hilo actual.
+        request = downloaded_file._WrapRequest(downloaded_file.auth.service.files().get_media(fileId=downloaded_file['id']))
+        with open(partial_path, 'r+b') as f:
+            f.seek(offset)
+            while offset < total_size:
+                headers = dict(request.headers, range=f"bytes={offset}-{min(offset + self.chunksize, total_size) - 1}")
+                response, content = request.http.request(request.uri, "GET", headers=headers)
+                if response.status == 200:
+                    # El servidor ignoró el rango y devolvió el archivo completo
+                    f.seek(0)
+                    f.truncate()
+                    offset = 0
+                elif response.status != 206:
+                    raise IOError(f"Error {response.status} al descargar {downloaded_file['id']}")
+                if not content:
+                    raise IOError(f"Descarga incompleta de {downloaded_file['id']}: {offset} de {total_size} bytes")
+                f.write(content)
+                offset += len(content)
+
+    def download_files(self, archivo_list, local_folder_path):
+        """
+        Descarga varios archivos de forma concurrente.
+
+        Args:
+            archivo_list (list): Elementos de Drive con 'id' y 'title'.
+            local_folder_path (str): Carpeta local de destino.
+
+        Returns:
+            list: Rutas locales de los archivos descargados.
+        """
+        os.makedirs(local_folder_path, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(lambda archivo: self._download_file(archivo, local_folder_path), archivo_list))
+
     def download_folder_by_link(self, folder_link, local_folder_path = None):
         formato_link_carpeta_compartida = "https://drive.google.com/drive/folders/"
         formato_link_archivo_compartido = "https://drive.google.com/file/d/"
@@ -143,21 +311,16 @@ class GoogleDriveManager:
 
                 if folder_id:
                     # Obtiene la lista de archivos dentro de la carpeta compartida por su ID
-                    archivo_list = self.drive.ListFile({'q': f"'{folder_id}' in parents and trashed=false"}).GetList()
+                    # Se vuelve a listar para ver los archivos añadidos o borrados desde fuera de esta instancia
+                    archivo_list = self._list_folder(folder_id, is_folder=False, refresh=True)
 
                     # Ruta local en Google Colab donde se descargarán los archivos
                     downloaded = self.drive.CreateFile({'id': folder_id})
                     nombre_carpeta = downloaded['title']
                     ruta_carpeta_entrada = os.path.join(local_folder_path or "/", nombre_carpeta)
 
-                    # Crea la carpeta local si no existe
-                    os.makedirs(ruta_carpeta_entrada, exist_ok=True)
-
-                    # Descarga cada archivo en la carpeta local
-                    for archivo in archivo_list:
-                        file_id = archivo['id']
-                        downloaded_file = self.drive.CreateFile({'id': file_id})
-                        downloaded_file.GetContentFile(os.path.join(ruta_carpeta_entrada, archivo['title']))
+                    # Descarga los archivos en la carpeta local de forma concurrente
+                    self.download_files(archivo_list, ruta_carpeta_entrada)
                     ruta_carpeta_salida = os.path.join(RUTA_REMOTA, f"{nombre_carpeta}")
                     return nombre_carpeta, ruta_carpeta_entrada, ruta_carpeta_salida
                 else:
@@ -171,11 +334,11 @@ class GoogleDriveManager:
                 id_archivo = folder_link.split('/')[-2]
                 downloaded = self.drive.CreateFile({'id': id_archivo})
                 tipo_archivo = downloaded['fileExtension']
-                
+
                 if tipo_archivo == "zip":
                     nombre_real_archivo = downloaded['title']
                     ruta_archivo_descargado = os.path.join(ruta_zip_local, nombre_real_archivo)
-                    downloaded.GetContentFile(ruta_archivo_descargado)
+                    downloaded.GetContentFile(ruta_archivo_descargado, chunksize=self.chunksize)
                     ruta_carpeta_entrada = ruta_archivo_descargado.replace(".zip", "")
                     nombre_real_archivo = nombre_real_archivo.replace(".zip", "")
                     os.makedirs(ruta_carpeta_entrada, exist_ok=True)
@@ -187,18 +350,18 @@ class GoogleDriveManager:
                 elif tipo_archivo == "ttf":
                     nombre_real_archivo = downloaded['title']
                     ruta_archivo_descargado = os.path.join(local_folder_path, nombre_real_archivo)
-                    downloaded.GetContentFile(ruta_archivo_descargado)
+                    downloaded.GetContentFile(ruta_archivo_descargado, chunksize=self.chunksize)
                     return ruta_archivo_descargado
                 elif tipo_archivo == "ckpt":
                     nombre_real_archivo = downloaded['title']
                     ruta_archivo_descargado = os.path.join(local_folder_path, nombre_real_archivo)
-                    downloaded.GetContentFile(ruta_archivo_descargado)
+                    downloaded.GetContentFile(ruta_archivo_descargado, chunksize=self.chunksize)
                     return ruta_archivo_descargado
                 else:
-                    self.etiqueta_info_carga.value = "Error, no es un archivo válido."
+                    print("Error, no es un archivo válido.")
                     return None
             else:
                 return None
-                    
+
         except Exception as e:
-            return None
\ No newline at end of file
+            return None
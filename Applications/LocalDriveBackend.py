@@ -0,0 +1,143 @@
+import os
+import re
+import shutil
+import threading
+import uuid
+
+class LocalDriveBackend:
+    """
+    Backend local que imita el subconjunto de pydrive2.GoogleDrive que usa GoogleDriveManager.
+    Guarda el contenido de los archivos en root_path y sus metadatos en memoria; permite usar
+    GoogleDriveManager(drive=LocalDriveBackend(ruta)) sin autenticación de Google Colab.
+    """
+    def __init__(self, root_path):
+        self.root_path = root_path
+        self.files = {}
+        self._lock = threading.Lock()
+        self.auth = LocalDriveAuth(self)
+        os.makedirs(self.root_path, exist_ok=True)
+
+    def CreateFile(self, metadata=None):
+        return LocalDriveFile(self, metadata)
+
+    def ListFile(self, param=None):
+        return LocalDriveFileList(self, param or {})
+
+    def _blob_path(self, file_id):
+        return os.path.join(self.root_path, file_id)
+
+    def _query(self, query):
+        parent = re.search(r"'([^']+)' in parents", query)
+        mime_type = re.search(r"mimeType\s*(!?=)\s*'([^']+)'", query)
+        with self._lock:
+            items = [dict(item) for item in self.files.values()]
+        result = []
+        for item in items:
+            if "trashed=false" in query and item.get('trashed'):
+                continue
+            if parent and parent.group(1) not in [p['id'] for p in item.get('parents', [])]:
+                continue
+            if mime_type and (item.get('mimeType') == mime_type.group(2)) != (mime_type.group(1) == "="):
+                continue
+            result.append(item)
+        return sorted(result, key=lambda item: item['title'])
+
+class LocalDriveFile(dict):
+    def __init__(self, backend, metadata=None):
+        super().__init__(metadata or {})
+        self.backend = backend
+        self._content_path = None
+
+    def __getitem__(self, key):
+        # Igual que pydrive2, los metadatos que faltan se obtienen del backend a partir del ID
+        if key not in self and 'id' in self:
+            with self.backend._lock:
+                self.update(self.backend.files.get(dict.__getitem__(self, 'id'), {}))
+        return dict.__getitem__(self, key)
+
+    def SetContentFile(self, filename):
+        self._content_path = filename
+
+    def Upload(self, param=None):
+        if 'id' not in self:
+            self['id'] = uuid.uuid4().hex
+        self.setdefault('mimeType', 'application/octet-stream')
+        self.setdefault('parents', [{'id': 'root'}])
+        self.setdefault('trashed', False)
+        if self._content_path:
+            shutil.copyfile(self._content_path, self.backend._blob_path(dict.__getitem__(self, 'id')))
+            self['fileSize'] = str(os.path.getsize(self._content_path))
+            self['fileExtension'] = os.path.splitext(self.get('title', ''))[1].lstrip('.')
+        with self.backend._lock:
+            self.backend.files[dict.__getitem__(self, 'id')] = dict(self)
+
+    @property
+    def auth(self):
+        return self.backend.auth
+
+    def _WrapRequest(self, request):
+        return request
+
+    def GetContentFile(self, filename, chunksize=1024 * 1024, **kwargs):
+        with open(self.backend._blob_path(dict.__getitem__(self, 'id')), 'rb') as source, open(filename, 'wb') as target:
+            shutil.copyfileobj(source, target, chunksize)
+
+    def Trash(self, param=None):
+        with self.backend._lock:
+            self.backend.files[dict.__getitem__(self, 'id')]['trashed'] = True
+
+class LocalDriveFileList:
+    def __init__(self, backend, param):
+        self.backend = backend
+        self.param = param
+
+    def __iter__(self):
+        # Devuelve los resultados por páginas de maxResults elementos, como pydrive2
+        items = self.backend._query(self.param.get('q', ''))
+        page_size = self.param.get('maxResults') or len(items) or 1
+        for start in range(0, len(items), page_size):
+            yield items[start:start + page_size]
+
+    def GetList(self):
+        return [item for page in self for item in page]
+
+class LocalDriveAuth:
+    # Imita auth.service.files().get_media() de pydrive2 y la petición HTTP con cabecera Range que se hace con ella
+    def __init__(self, backend):
+        self.service = self
+        self.backend = backend
+        self.http = LocalDriveHttp()
+
+    def files(self):
+        return self
+
+    def get_media(self, fileId):
+        return LocalDriveMediaRequest(self.backend._blob_path(fileId), self.http)
+
+class LocalDriveMediaRequest:
+    def __init__(self, uri, http):
+        self.uri = uri
+        self.headers = {}
+        self.http = http
+
+class LocalDriveResponse(dict):
+    def __init__(self, status, headers=None):
+        super().__init__(headers or {})
+        self.status = status
+
+class LocalDriveHttp:
+    def __init__(self):
+        self.requests = []
+
+    def request(self, uri, method="GET", headers=None):
+        self.requests.append(dict(headers or {}))
+        with open(uri, 'rb') as f:
+            content = f.read()
+        byte_range = re.match(r"bytes=(\d+)-(\d*)", (headers or {}).get('range', ''))
+        if byte_range is None:
+            return LocalDriveResponse(200, {'content-length': str(len(content))}), content
+        start = int(byte_range.group(1))
+        end = int(byte_range.group(2)) if byte_range.group(2) else len(content) - 1
+        if start >= len(content):
+            return LocalDriveResponse(416, {'content-range': f"bytes */{len(content)}"}), b""
+        return LocalDriveResponse(206, {'content-range': f"bytes {start}-{min(end, len(content) - 1)}/{len(content)}"}), content[start:end + 1]
@@ -1,7 +1,5 @@
 import os
-import numpy as np
-from scipy.io import wavfile
-import noisereduce as nr
+from Applications.AudioBuffer import AudioBuffer
 
 class NoiseReducer:
     def __init__(self):
@@ -20,13 +18,13 @@ class NoiseReducer:
             str or None: Ruta al archivo de audio procesado si se ejecutó correctamente, None si ocurrió un error.
         """
         try:
-            sr = 44100
+            import noisereduce as nr
             porcentaje_reduccion = float(umbral_reduction/100)
-            rate, data = wavfile.read(input_audio_path)
-            orig_shape = data.shape
-            data = np.reshape(data, (2, -1))
+            # noisereduce acepta cualquier tasa de muestreo y número de canales, así que el audio se usa en su formato nativo
+            audio_buffer = AudioBuffer.from_file(input_audio_path)
             
-            ruido_reducido = nr.reduce_noise(y=data, sr=sr, prop_decrease=porcentaje_reduccion)  
+            # El buffer ya está en forma (canales, muestras), que es la que espera noisereduce
+            ruido_reducido = nr.reduce_noise(y=audio_buffer.data, sr=audio_buffer.sample_rate, prop_decrease=porcentaje_reduccion)  
             
             # Crear el nombre de archivo de salida
             output_filename = f"without_noise_{os.path.basename(input_audio_path)}"
@@ -34,7 +32,7 @@ class NoiseReducer:
             # Guardar el archivo de audio procesado
             output_path = os.path.join(output_audio_path, output_filename)
             
-            wavfile.write(output_path, sr, ruido_reducido.reshape(orig_shape))
+            AudioBuffer(ruido_reducido, audio_buffer.sample_rate).write(output_path)
             return output_path
         except Exception as e:
             print(f"Error al reducir el ruido del archivo de audio: {e}")
@@ -0,0 +1,11 @@
+from numba import prange, jit
+
+# Kernels compilados con numba. Este módulo solo se importa cuando se necesita un kernel, y cache=True
+# guarda el código compilado en __pycache__ para no repetir la compilación JIT en cada ejecución.
+
+@jit(parallel=True, nopython=True, cache=True)
+def subtract_echo(audio_data, echo, delay, mu):
+    for i in prange(delay, len(audio_data)):
+        audio_data[i] -= mu * echo[i-delay]
+
+    return audio_data
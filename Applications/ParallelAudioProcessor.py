@@ -2,6 +2,8 @@ import os
 import shutil
 from concurrent.futures import ThreadPoolExecutor
 from Applications.AudioProcessing import AudioProcessing
+from Applications.ParallelAutoTuner import ParallelAutoTuner
+from Applications.ArtifactStore import ArtifactStore
 
 class ParallelAudioProcessor:
     def __init__(self, temp_split_path, temp_processed_path):
@@ -12,8 +14,9 @@ class ParallelAudioProcessor:
                 os.makedirs(self.temp_split_path)
         if not os.path.exists(self.temp_processed_path):
                 os.makedirs(self.temp_processed_path)
+        self.artifact_store = ArtifactStore(self.temp_split_path)
 
-    def process_in_parallel(self, input_audio_path, output_filename, output_audio_path, process_function, num_threads = 4):
+    def process_in_parallel(self, input_audio_path, output_filename, output_audio_path, process_function, num_threads=None, chunk_seconds=None, stage_name=None, max_workers=None):
         """
         Gestiona el procesamiento paralelo de archivos de audio.
 
@@ -22,28 +25,76 @@ class ParallelAudioProcessor:
             output_filename (str): Nombre del archivo de audio de salida.
             output_audio_path (str): Ruta para guardar el archivo de audio procesado.
             process_function (function): Función que procesa un segmento de audio.
-            num_threads (int): Número de hilos a utilizar para el procesamiento paralelo.
+            num_threads (int): Número de hilos a utilizar para el procesamiento paralelo. None lo elige el autoajuste.
+            chunk_seconds (float): Duración de cada segmento en segundos. None lo elige el autoajuste.
+            stage_name (str): Nombre con el que se guarda la calibración de la etapa.
+            max_workers (int): Límite superior de hilos que admite la etapa.
 
         Returns:
             str or None: Ruta al archivo procesado si se ejecutó correctamente, None si ocurrió un error.
         """
         try:
-            # Dividir el audio en segmentos de 60 segundos
-            self.audio_processing.split_audio(input_audio_path, self.temp_split_path, 60000) # 60 segundos
-            # Obtener la lista de archivos de segmento
-            segment_files = os.listdir(self.temp_split_path)
-
-            # Dividir la lista de archivos en partes iguales
-            chunk_size = (len(segment_files) + num_threads - 1) // num_threads
-            segment_chunks = [segment_files[i:i+chunk_size] for i in range(0, len(segment_files), chunk_size)]
-            
-            # Procesar los segmentos en paralelo usando el número de hilos especificado
+            # Decodificar la entrada una sola vez en un artefacto con acceso aleatorio
+            input_info = self.artifact_store.import_file("input", input_audio_path)
+            duration = input_info["frames"] / input_info["sample_rate"]
+
+            # Cada tarea exporta su segmento del artefacto justo antes de procesarlo y lo borra al terminar, para que la
+            # exportación se solape con el procesamiento y los segmentos no se acumulen en disco. Los índices mantienen
+            # el orden al combinar.
+            def process_segment(segment):
+                index, start, end = segment
+                segment_file = f"segment_{index}.wav"
+                segment_path = os.path.join(self.temp_split_path, segment_file)
+                self.artifact_store.export_range("input", start, end, segment_path)
+                try:
+                    return process_function(segment_file)
+                finally:
+                    os.remove(segment_path)
+
+            offset = 0.0
+            index = 1
+            if num_threads is None or chunk_seconds is None:
+                tuner = ParallelAutoTuner(stage_name or "default", max_workers)
+                params = tuner.load()
+                if params is None:
+                    # Calibrar con los primeros segmentos del propio audio, que quedan procesados
+                    for length in tuner.CALIBRATION_SECONDS:
+                        if offset >= duration:
+                            break
+                        end = min(offset + length, duration)
+                        tuner.measure(process_segment, (index, offset, end), end - offset)
+                        offset = end
+                        index += 1
+                    # Medir varios segmentos a la vez para estimar la escalabilidad real de la etapa
+                    num_workers = tuner.concurrency_level()
+                    length = tuner.CONCURRENT_CALIBRATION_SECONDS
+                    if num_workers >= 2 and duration - offset >= num_workers * length:
+                        segments = []
+                        for _ in range(num_workers):
+                            segments.append((index, offset, offset + length))
+                            offset += length
+                            index += 1
+                        tuner.measure_concurrent(process_segment, segments, length)
+                    params = tuner.tune(duration - offset)
+                num_threads = num_threads or params["num_workers"]
+                chunk_seconds = chunk_seconds or params["chunk_seconds"]
+
+            segments = []
+            while offset < duration:
+                end = min(offset + chunk_seconds, duration)
+                segments.append((index, offset, end))
+                offset = end
+                index += 1
+            print(f"Procesando {duration:.2f} segundos en segmentos de {chunk_seconds} segundos con {num_threads} hilos")
+
+            # Dividir y procesar los segmentos en paralelo usando el número de hilos especificado
             with ThreadPoolExecutor(max_workers=num_threads) as executor:
-                for chunk in segment_chunks:
-                    executor.map(process_function, chunk)
+                list(executor.map(process_segment, segments))
             
             # Combinar los segmentos procesados
             output_path = self.audio_processing.combine_audio(self.temp_processed_path, output_audio_path, output_filename)
+            # Liberar el memmap del artefacto antes de borrarlo; en Windows no se puede eliminar un archivo mapeado
+            self.artifact_store.delete("input")
             # Eliminar carpetas temporales        
             shutil.rmtree(self.temp_split_path)
             shutil.rmtree(self.temp_processed_path)        
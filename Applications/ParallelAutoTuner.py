@@ -0,0 +1,229 @@
+import json
+import math
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+RUTA_CACHE_AUTOTUNE = os.path.join(os.path.expanduser("~"), ".cache", "demiset", "autotune.json")
+
+class ParallelAutoTuner:
+    """
+    Elige la duración de los segmentos y el número de hilos de ParallelAudioProcessor para cada etapa.
+    Mide el tiempo y la memoria de los primeros segmentos uno a uno, ajusta un modelo lineal (coste fijo + coste por segundo
+    de audio) y mide después varios segmentos a la vez para estimar cuánto escala la etapa con más hilos. Con eso busca la
+    combinación de mayor rendimiento que cabe en el límite de memoria. El resultado se guarda por host.
+    """
+    CALIBRATION_SECONDS = (10, 20)
+    CONCURRENT_CALIBRATION_SECONDS = 10
+    MAX_CONCURRENT_CALIBRATION_WORKERS = 4
+    CANDIDATE_CHUNK_SECONDS = (15, 30, 60, 120, 240)
+    # Se elige el menor número de hilos cuyo rendimiento estimado esté dentro de este margen del mejor
+    THROUGHPUT_TOLERANCE = 0.95
+
+    def __init__(self, stage_name, max_workers=None, memory_fraction=0.7, cache_path=RUTA_CACHE_AUTOTUNE):
+        """
+        Args:
+            stage_name (str): Nombre de la etapa; cada etapa se calibra por separado.
+            max_workers (int): Límite superior de hilos impuesto por la etapa. None usa el número de núcleos.
+            memory_fraction (float): Fracción de la memoria disponible que pueden usar los hilos.
+            cache_path (str): Archivo JSON donde se guardan los parámetros calibrados por host.
+        """
+        self.stage_name = stage_name
+        self.cpu_count = os.cpu_count() or 1
+        self.max_workers = min(max_workers or self.cpu_count, self.cpu_count)
+        self.memory_fraction = memory_fraction
+        self.cache_path = cache_path
+        self.host = socket.gethostname()
+        self.samples = []
+        self.concurrent_sample = None
+
+    def load(self):
+        """
+        Obtiene los parámetros calibrados en una ejecución anterior en este host.
+
+        Returns:
+            dict or None: Parámetros con "chunk_seconds" y "num_workers", o None si no hay calibración válida.
+        """
+        try:
+            with open(self.cache_path) as f:
+                params = json.load(f).get(self.host, {}).get(self.stage_name)
+        except (OSError, ValueError):
+            return None
+        # Una calibración hecha con otro número de núcleos o con otro límite de hilos no es válida
+        if not params or params.get("cpu_count") != self.cpu_count or params["num_workers"] > self.max_workers:
+            return None
+        return params
+
+    def measure(self, process_function, segment, segment_seconds):
+        """
+        Procesa un segmento midiendo su tiempo y el pico de memoria del proceso.
+
+        Args:
+            process_function (function): Función que procesa un segmento de audio.
+            segment: Argumento de process_function que identifica el segmento.
+            segment_seconds (float): Duración del segmento en segundos.
+
+        Returns:
+            Resultado de process_function.
+        """
+        baseline = self._memory_usage()
+        peak = [baseline]
+        stop = threading.Event()
+
+        def sample_memory():
+            while not stop.wait(0.05):
+                peak[0] = max(peak[0], self._memory_usage())
+
+        sampler = threading.Thread(target=sample_memory, daemon=True)
+        sampler.start()
+        start_time = time.perf_counter()
+        try:
+            return process_function(segment)
+        finally:
+            elapsed = time.perf_counter() - start_time
+            stop.set()
+            sampler.join()
+            peak[0] = max(peak[0], self._memory_usage())
+            self.samples.append((segment_seconds, elapsed, max(0, peak[0] - baseline)))
+
+    def concurrency_level(self):
+        """
+        Número de hilos con el que medir la escalabilidad, limitado por la etapa y por la memoria medida en serie.
+
+        Returns:
+            int: Número de hilos; menor que 2 si no se puede medir la ejecución concurrente.
+        """
+        memory_fixed, memory_per_second = self._fit([(length, memory) for length, _, memory in self.samples])
+        chunk_memory = memory_fixed + memory_per_second * self.CONCURRENT_CALIBRATION_SECONDS
+        memory_limit = int(self.memory_fraction * self._available_memory() // chunk_memory) if chunk_memory > 0 else self.max_workers
+        return min(self.max_workers, self.MAX_CONCURRENT_CALIBRATION_WORKERS, memory_limit)
+
+    def measure_concurrent(self, process_function, segments, segment_seconds):
+        """
+        Procesa varios segmentos a la vez, uno por hilo, y mide el tiempo total.
+
+        Args:
+            process_function (function): Función que procesa un segmento de audio.
+            segments (list): Argumentos de process_function que identifican cada segmento.
+            segment_seconds (float): Duración de cada segmento en segundos.
+        """
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+            list(executor.map(process_function, segments))
+        self.concurrent_sample = (len(segments), segment_seconds, time.perf_counter() - start_time)
+
+    def _contention(self, time_fixed, time_per_second):
+        # Ley de Amdahl: speedup(W) = W / (1 + alpha * (W - 1)). alpha = 0 escala perfectamente, alpha >= 1 no gana nada.
+        # Sin medición concurrente se asume que no escala.
+        if self.concurrent_sample is None:
+            return 1.0
+        num_workers, segment_seconds, elapsed = self.concurrent_sample
+        serial_time = num_workers * (time_fixed + time_per_second * segment_seconds)
+        speedup = serial_time / max(elapsed, 1e-6)
+        return max(0.0, (num_workers / max(speedup, 1e-6) - 1) / (num_workers - 1))
+
+    def tune(self, remaining_seconds):
+        """
+        Elige la duración de segmento y el número de hilos a partir de las mediciones. El resultado solo se guarda si se
+        pudo medir la escalabilidad: con un audio demasiado corto para la medición concurrente se asume que la etapa no
+        escala, y guardar ese valor dejaría a la etapa con un solo hilo en las ejecuciones siguientes.
+
+        Args:
+            remaining_seconds (float): Duración del audio que queda por procesar.
+
+        Returns:
+            dict: Parámetros con "chunk_seconds" y "num_workers".
+        """
+        time_fixed, time_per_second = self._fit([(length, elapsed) for length, elapsed, _ in self.samples])
+        memory_fixed, memory_per_second = self._fit([(length, memory) for length, _, memory in self.samples])
+        memory_cap = self.memory_fraction * self._available_memory()
+        contention = self._contention(time_fixed, time_per_second)
+
+        candidates = []
+        for chunk_seconds in self.CANDIDATE_CHUNK_SECONDS:
+            chunk_time = time_fixed + time_per_second * chunk_seconds
+            chunk_memory = memory_fixed + memory_per_second * chunk_seconds
+            num_chunks = max(1, math.ceil(remaining_seconds / chunk_seconds))
+            for num_workers in range(1, self.max_workers + 1):
+                if num_workers > 1 and num_workers * chunk_memory > memory_cap:
+                    break
+                # Con menos segmentos que hilos, los hilos sobrantes quedan ociosos
+                active_workers = min(num_workers, num_chunks)
+                speedup = active_workers / (1 + contention * (active_workers - 1))
+                throughput = speedup * chunk_seconds / max(chunk_time, 1e-6)
+                candidates.append((throughput, num_workers, num_workers * chunk_memory, chunk_seconds))
+
+        # Entre las opciones cercanas al mejor rendimiento se prefieren menos hilos y después menos memoria
+        best_throughput = max(candidate[0] for candidate in candidates)
+        _, num_workers, _, chunk_seconds = min(
+            (candidate for candidate in candidates if candidate[0] >= self.THROUGHPUT_TOLERANCE * best_throughput),
+            key=lambda candidate: (candidate[1], candidate[2]),
+        )
+
+        params = {
+            "chunk_seconds": chunk_seconds,
+            "num_workers": num_workers,
+            "cpu_count": self.cpu_count,
+            "contention": contention,
+            "seconds_per_audio_second": time_per_second,
+            "memory_per_audio_second": memory_per_second,
+            "calibrated_at": time.time(),
+        }
+        if self.concurrent_sample is not None or self.max_workers == 1:
+            self._save(params)
+        return params
+
+    def _fit(self, points):
+        # Ajuste lineal y = a + b * x por mínimos cuadrados; con un solo punto todo el coste es proporcional
+        if len(points) == 1 or len({x for x, _ in points}) == 1:
+            x, y = points[-1]
+            return 0.0, y / max(x, 1e-6)
+        mean_x = sum(x for x, _ in points) / len(points)
+        mean_y = sum(y for _, y in points) / len(points)
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / sum((x - mean_x) ** 2 for x, _ in points)
+        slope = max(slope, 0.0)
+        return max(mean_y - slope * mean_x, 0.0), slope
+
+    def _save(self, params):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            try:
+                with open(self.cache_path) as f:
+                    cache = json.load(f)
+            except (OSError, ValueError):
+                cache = {}
+            cache.setdefault(self.host, {})[self.stage_name] = params
+            temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(cache, f, indent=2)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            print(f"Error al guardar la calibración de {self.stage_name}: {e}")
+
+    @staticmethod
+    def _memory_usage():
+        if psutil is not None:
+            return psutil.Process().memory_info().rss
+        try:
+            # Sin psutil se lee la memoria residente del proceso en Linux
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            return 0
+
+    @staticmethod
+    def _available_memory():
+        if psutil is not None:
+            return psutil.virtual_memory().available
+        try:
+            return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+        except (ValueError, OSError, AttributeError):
+            # Sin forma de saberlo se asume 4 GB
+            return 4 * 1024 ** 3
@@ -1,10 +1,6 @@
 import os
 import re
 from urllib.parse import unquote
-import requests
-import streamlink
-import ffmpeg
-from pytube import YouTube
 
 class RemoteFileDownloader:
     def __init__(self):
@@ -39,6 +35,7 @@ class RemoteFileDownloader:
                 download_link = download_url.replace("?dl=0", "?dl=1")
             # Verificar si la URL corresponde a un enlace de Twitch
             elif re.match(patron_twitch, download_url):
+                import streamlink
                 streams = streamlink.streams(download_url)
                 if streams:
                     if 'audio' in streams:
@@ -48,6 +45,7 @@ class RemoteFileDownloader:
                     selected_stream = streams[stream_key]
                     download_link = selected_stream.url
             elif re.match(patron_youtube, download_url):
+                from pytube import YouTube
                 yt = YouTube(download_url)
                 audio = yt.streams.filter(only_audio=True).first() # Obtener la secuencia de audio de mayor calidad disponible
                 if audio:
@@ -73,6 +71,7 @@ class RemoteFileDownloader:
             str: La ruta al archivo descargado en el sistema de archivos local.
         """
         try:
+            import requests
             os.makedirs(output_path, exist_ok=True)
             # Envía una solicitud HTTP GET a la URL de descarga
             remote_download_url = self.prepare_url(download_url)
@@ -91,6 +90,7 @@ class RemoteFileDownloader:
             output_file_path = os.path.join(output_path, output_filename)
 
             if output_filename == 'file.ts':
+                import ffmpeg
                 # Utiliza ffmpeg para descargar el archivo HLS
                 ffmpeg.input(remote_download_url).output(output_file_path, loglevel='quiet').run(overwrite_output=True)
             else:
@@ -43,7 +43,7 @@ class SilenceRemover:
                 output_path = os.path.join(temp_processed_path, output_filename)
                 processed_sound.export(output_path, format="wav")
 
-            output_path = parallel_procesor.process_in_parallel(input_audio_path, f"without_silence_{os.path.basename(input_audio_path)}", output_audio_path, process_segment)
+            output_path = parallel_procesor.process_in_parallel(input_audio_path, f"without_silence_{os.path.basename(input_audio_path)}", output_audio_path, process_segment, stage_name="silence_remover")
             return output_path
 
         except Exception as e:
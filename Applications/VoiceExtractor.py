@@ -1,5 +1,5 @@
 import os
-import demucs.api
+from Applications.AudioBuffer import AudioBuffer
 from Applications.AudioProcessing import AudioProcessing
 from Applications.ParallelAudioProcessor import ParallelAudioProcessor
 
@@ -8,7 +8,11 @@ class VoiceExtractor:
         self.audio_processing = AudioProcessing()
         # Inicializar el separador Demucs con el modelo predeterminado
         try:
+            # demucs y torch se importan aquí para que importar el módulo no cargue el modelo ni CUDA
+            import demucs.api
             self.separator = demucs.api.Separator(model="htdemucs_ft", segment=6)
+            # Formato que requiere el modelo; el audio se convierte una sola vez antes de separarlo
+            self.required_format = {"sample_rate": self.separator.samplerate, "channels": self.separator.audio_channels}
         except Exception as e:
             print(f"Error al inicializar el separador Demucs: {e}")
 
@@ -24,6 +28,8 @@ class VoiceExtractor:
             str: Ruta al archivo de voz extraído si se ejecutó correctamente, None si ocurrió un error.
         """
         try:
+            import demucs.api
+            import torch
             if not os.path.exists(output_audio_path):
                 os.makedirs(output_audio_path)
 
@@ -36,10 +42,13 @@ class VoiceExtractor:
             def process_segment(segment_file):
                 segment_path = os.path.join(temp_split_path, segment_file)
                 stem_output_path = os.path.join(temp_processed_path, f"vocals_{segment_file}")
-                origin, separated = self.separator.separate_audio_file(segment_path)
+                audio_buffer = AudioBuffer.from_file(segment_path).conform(self.required_format)
+                origin, separated = self.separator.separate_tensor(torch.from_numpy(audio_buffer.data))
                 demucs.api.save_audio(separated["vocals"], stem_output_path, samplerate=self.separator.samplerate)
 
-            output_path = parallel_procesor.process_in_parallel(input_audio_path, f"vocals_{os.path.basename(input_audio_path)}", output_audio_path, process_segment, 1)
+            # En GPU los hilos compiten por la misma tarjeta y su memoria no se mide, así que se usa un solo hilo
+            max_workers = 1 if self.audio_processing.device.type == "cuda" else None
+            output_path = parallel_procesor.process_in_parallel(input_audio_path, f"vocals_{os.path.basename(input_audio_path)}", output_audio_path, process_segment, stage_name="voice_extractor", max_workers=max_workers)
             return output_path
 
         except Exception as e:
@@ -0,0 +1,176 @@
+import json
+import sqlite3
+import time
+
+class WorkQueue:
+    """
+    Cola de trabajo sobre SQLite, sin servicios externos. Varios procesos o nodos que comparten el archivo
+    reclaman elementos con un arriendo (lease); si un trabajador muere, su elemento vuelve a estar disponible
+    cuando el arriendo expira. El archivo debe estar en un sistema de archivos con bloqueos funcionales.
+    """
+    def __init__(self, db_path, timeout=60):
+        self.db_path = db_path
+        self.timeout = timeout
+        with self._connect() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS items (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    UNIQUE (job, position)
+                )
+            """)
+
+    def _connect(self):
+        # Una conexión por operación: las conexiones de sqlite3 no se comparten entre hilos
+        connection = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return _Transaction(connection)
+
+    def enqueue(self, job, payloads):
+        """
+        Añade los elementos de un trabajo a la cola en el orden indicado.
+
+        Args:
+            job (str): Identificador del trabajo.
+            payloads (list): Datos serializables en JSON de cada elemento.
+
+        Returns:
+            int: Número de elementos añadidos.
+        """
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO items (job, position, payload) VALUES (?, ?, ?)",
+                [(job, position, json.dumps(payload)) for position, payload in enumerate(payloads)],
+            )
+            return len(payloads)
+
+    def claim(self, worker_id, lease_seconds=600, job=None, max_attempts=3):
+        """
+        Reclama el primer elemento pendiente o con el arriendo expirado. Los elementos cuyo arriendo expiró tras
+        agotar max_attempts intentos se marcan como fallidos en lugar de volver a reclamarse.
+
+        Args:
+            worker_id (str): Identificador del trabajador.
+            lease_seconds (float): Duración del arriendo en segundos.
+            job (str): Si se indica, solo se reclaman elementos de ese trabajo.
+            max_attempts (int): Número máximo de intentos por elemento.
+
+        Returns:
+            dict or None: Elemento con "id", "job", "position" y "payload", o None si no hay trabajo disponible.
+        """
+        now = time.time()
+        with self._connect() as connection:
+            # Un elemento que tumba a sus trabajadores no debe reclamarse indefinidamente
+            connection.execute(
+                "UPDATE items SET status = 'failed', error = COALESCE(error, 'Arriendo expirado'), lease_expires = NULL "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, max_attempts),
+            )
+            query = "SELECT * FROM items WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) AND attempts < ?"
+            params = [now, max_attempts]
+            if job is not None:
+                query += " AND job = ?"
+                params.append(job)
+            row = connection.execute(query + " ORDER BY job, position LIMIT 1", params).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE items SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                (worker_id, now + lease_seconds, row["id"]),
+            )
+            return {"id": row["id"], "job": row["job"], "position": row["position"], "payload": json.loads(row["payload"])}
+
+    def renew(self, item_id, worker_id, lease_seconds=600):
+        """
+        Renueva el arriendo de un elemento.
+
+        Returns:
+            bool: True si el trabajador aún tenía el arriendo, False si lo perdió.
+        """
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE items SET lease_expires = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + lease_seconds, item_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, item_id, worker_id, result):
+        """
+        Marca un elemento como terminado.
+
+        Returns:
+            bool: True si se registró el resultado, False si el trabajador ya no tenía el arriendo.
+        """
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE items SET status = 'done', result = ?, lease_expires = NULL WHERE id = ? AND worker = ? AND status = 'leased'",
+                (json.dumps(result), item_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, item_id, worker_id, error, max_attempts=3):
+        """
+        Registra un error; el elemento vuelve a la cola hasta agotar max_attempts intentos.
+        """
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE items SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = ?, lease_expires = NULL WHERE id = ? AND worker = ? AND status = 'leased'",
+                (max_attempts, str(error), item_id, worker_id),
+            )
+
+    def status(self, job):
+        """
+        Cuenta los elementos de un trabajo por estado.
+
+        Returns:
+            dict: Número de elementos en cada estado.
+        """
+        with self._connect() as connection:
+            rows = connection.execute("SELECT status, COUNT(*) AS total FROM items WHERE job = ? GROUP BY status", (job,)).fetchall()
+            return {row["status"]: row["total"] for row in rows}
+
+    def results(self, job):
+        """
+        Obtiene los resultados de un trabajo en el orden en que se encolaron.
+
+        Returns:
+            list: Resultados de los elementos terminados, None para los que no lo están.
+        """
+        with self._connect() as connection:
+            rows = connection.execute("SELECT status, result FROM items WHERE job = ? ORDER BY position", (job,)).fetchall()
+            return [json.loads(row["result"]) if row["status"] == "done" else None for row in rows]
+
+    def payloads(self, job):
+        """
+        Obtiene los datos de los elementos de un trabajo en el orden en que se encolaron.
+
+        Returns:
+            list: Datos de cada elemento.
+        """
+        with self._connect() as connection:
+            rows = connection.execute("SELECT payload FROM items WHERE job = ? ORDER BY position", (job,)).fetchall()
+            return [json.loads(row["payload"]) for row in rows]
+
+class _Transaction:
+    # Ejecuta las operaciones en una transacción IMMEDIATE para que reclamar un elemento sea atómico entre procesos
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            self.connection.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.connection.close()
@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import numpy as np
+import soundfile as sf
+from Applications.AudioProbe import AudioProbe
+
+class AudioProbeTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_path = tempfile.mkdtemp()
+        self.audio_probe = AudioProbe()
+        AudioProbe._info_cache.clear()
+        AudioProbe._listing_cache.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_path)
+
+    def _write(self, name, seconds=1.0):
+        path = os.path.join(self.temp_path, name)
+        sf.write(path, np.zeros(int(seconds * 8000), dtype=np.float32), 8000)
+        return path
+
+    def _age(self, path, seconds=60):
+        past = time.time() - seconds
+        os.utime(path, (past, past))
+
+    def test_listing_is_natural_sorted_and_filtered(self):
+        for name in ("segment_10.wav", "segment_2.wav"):
+            self._write(name)
+        with open(os.path.join(self.temp_path, "notes.txt"), "w") as f:
+            f.write("x")
+        self.assertEqual(self.audio_probe.list_audio_files(self.temp_path), ["segment_2.wav", "segment_10.wav"])
+
+    def test_recently_modified_directory_is_not_cached(self):
+        self._write("a.wav")
+        self.audio_probe.list_audio_files(self.temp_path)
+        self.assertEqual(len(AudioProbe._listing_cache), 0)
+
+        self._age(self.temp_path)
+        self.audio_probe.list_audio_files(self.temp_path)
+        self.assertEqual(len(AudioProbe._listing_cache), 1)
+
+    def test_probe_replaces_entry_when_file_changes(self):
+        path = self._write("a.wav", 1.0)
+        self.assertAlmostEqual(self.audio_probe.probe(path)["duration"], 1.0)
+        self._write("a.wav", 2.0)
+        self._age(path, 30)
+        self.assertAlmostEqual(self.audio_probe.probe(path)["duration"], 2.0)
+        self.assertEqual(len(AudioProbe._info_cache), 1)
+
+    def test_info_cache_is_bounded(self):
+        paths = [self._write(f"{i}.wav") for i in range(4)]
+        original = AudioProbe.MAX_INFO_ENTRIES
+        AudioProbe.MAX_INFO_ENTRIES = 2
+        try:
+            self.audio_probe.probe_many(paths)
+        finally:
+            AudioProbe.MAX_INFO_ENTRIES = original
+        self.assertEqual(len(AudioProbe._info_cache), 2)
+
+if __name__ == "__main__":
+    unittest.main()
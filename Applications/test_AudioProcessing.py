@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import soundfile as sf
+from Applications.AudioBuffer import AudioBuffer
+from Applications.AudioProcessing import AudioProcessing
+from Applications.DatasetIndex import DatasetIndex
+
+SAMPLE_RATE = 8000
+
+def tone_with_pauses(seconds, pauses):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    audio = (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    for start, end in pauses:
+        audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)] = 0
+    return audio
+
+class AudioProcessingTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_path = tempfile.mkdtemp()
+        self.audio_processing = AudioProcessing()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_path)
+
+    def _cut_points(self, audio, time_ms, min_ms, max_ms, frame_ms=10):
+        frame_energy = AudioBuffer.frame_energy(audio[:, np.newaxis], SAMPLE_RATE, frame_ms)
+        duration = len(audio) * 1000 // SAMPLE_RATE
+        return self.audio_processing._find_cut_points(frame_energy, frame_ms, duration, time_ms, min_ms, max_ms)
+
+    def test_cuts_in_the_middle_of_each_pause(self):
+        audio = tone_with_pauses(50, [(19.5, 19.8), (38.2, 38.5)])
+        cuts = self._cut_points(audio, 20000, 10000, 30000)
+        self.assertEqual(len(cuts), 3)
+        self.assertAlmostEqual(cuts[0][1], 19650, delta=20)
+        self.assertAlmostEqual(cuts[1][1], 38350, delta=20)
+
+    def test_cuts_are_contiguous_and_within_limits(self):
+        audio = tone_with_pauses(60, [(7.0, 7.2), (16.0, 16.3), (31.0, 31.1), (44.0, 44.5)])
+        cuts = self._cut_points(audio, 10000, 5000, 15000)
+        self.assertEqual(cuts[0][0], 0)
+        self.assertEqual(cuts[-1][1], 60000)
+        for (_, end), (start, _) in zip(cuts[:-1], cuts[1:]):
+            self.assertEqual(end, start)
+        for start, end in cuts:
+            self.assertTrue(5000 <= end - start <= 15000)
+
+    def test_zero_min_ms_never_produces_empty_segments(self):
+        audio = tone_with_pauses(5, [(0.0, 0.5)])
+        cuts = self._cut_points(audio, 1000, 0, 1500)
+        self.assertTrue(all(end > start for start, end in cuts))
+
+    def test_split_audio_writes_segments_and_manifest(self):
+        audio = tone_with_pauses(30, [(9.5, 9.8), (20.1, 20.4)])
+        input_path = os.path.join(self.temp_path, "input.wav")
+        sf.write(input_path, audio, SAMPLE_RATE)
+        output_path = os.path.join(self.temp_path, "dataset")
+
+        self.assertEqual(self.audio_processing.split_audio(input_path, output_path, 10000, smart=True), output_path)
+        dataset_index = DatasetIndex.load(output_path)
+        self.assertEqual(len(dataset_index), 3)
+        self.assertAlmostEqual(sum(dataset_index.columns["duration"]), 30, places=2)
+        for filename in dataset_index.columns["file"]:
+            self.assertTrue(os.path.exists(os.path.join(output_path, filename)))
+
+    def test_split_audio_rejects_min_ms_above_max_ms(self):
+        input_path = os.path.join(self.temp_path, "input.wav")
+        sf.write(input_path, tone_with_pauses(5, []), SAMPLE_RATE)
+        output_path = os.path.join(self.temp_path, "dataset")
+        self.assertIsNone(self.audio_processing.split_audio(input_path, output_path, 1000, smart=True, min_ms=2000, max_ms=1500))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest import mock
+import numpy as np
+import soundfile as sf
+from Applications.AudioBuffer import AudioBuffer
+from Applications.DistributedProcessor import DistributedProcessor, run_local_workers
+from Applications.ParallelAutoTuner import ParallelAutoTuner
+from Applications.WorkQueue import WorkQueue
+
+SAMPLE_RATE = 8000
+
+class DistributedProcessorTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_path = tempfile.mkdtemp()
+        self.job_path = os.path.join(self.temp_path, "job")
+        # Tono con una pausa de 0.5 segundos cada 4 segundos
+        t = np.arange(20 * SAMPLE_RATE) / SAMPLE_RATE
+        self.audio = (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+        self.audio[(t % 4 >= 3.5)] = 0
+        self.input_path = os.path.join(self.temp_path, "input.wav")
+        sf.write(self.input_path, self.audio, SAMPLE_RATE, subtype="FLOAT")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_path)
+
+    def _payloads(self, job):
+        connection = sqlite3.connect(os.path.join(self.job_path, "queue.sqlite"))
+        try:
+            rows = connection.execute("SELECT payload FROM items WHERE job = ? ORDER BY position", (job,)).fetchall()
+        finally:
+            connection.close()
+        return [json.loads(payload) for payload, in rows]
+
+    def test_local_workers_process_and_merge_overlapping_shards(self):
+        processor = DistributedProcessor(self.job_path)
+        job = processor.submit(self.input_path, "test", shard_seconds=4, search_seconds=1, stages=())
+        payloads = self._payloads(job)
+        # Las fronteras caen en las pausas y cada fragmento se solapa con el siguiente
+        for previous, current in zip(payloads[:-1], payloads[1:]):
+            self.assertAlmostEqual(previous["end"] - current["start"], 0.05)
+            self.assertTrue(3.5 <= current["start"] % 4 < 4)
+        self.assertEqual(payloads[-1]["end"], 20)
+
+        run_local_workers(self.job_path, 3, job)
+        self.assertTrue(processor.wait(job, poll_seconds=0.1, timeout=10))
+        self.assertEqual(processor.queue.status(job), {"done": len(payloads)})
+
+        merged = AudioBuffer.from_file(processor.merge(job, os.path.join(self.temp_path, "merged")))
+        self.assertLessEqual(abs(merged.frames - len(self.audio)), len(payloads))
+        frames = min(merged.frames, len(self.audio))
+        np.testing.assert_allclose(merged.data[0, :frames], self.audio[:frames], atol=0.01)
+
+        # Tras unir, se eliminan el artefacto de entrada y los resultados de los fragmentos
+        self.assertEqual(os.listdir(os.path.join(self.job_path, "outputs")), [])
+        self.assertFalse(any(name.startswith(job) for name in os.listdir(os.path.join(self.job_path, "artifacts"))))
+
+    def _complete_with_gains(self, processor, job, gains):
+        # Simula trabajadores cuyo resultado sin normalizar sale con un nivel distinto en cada fragmento
+        for gain in gains:
+            item = processor.queue.claim("worker", job=job)
+            path = os.path.join(self.job_path, "outputs", f"{job}_{item['position']}.wav")
+            shard = processor.artifact_store.read(job, item["payload"]["start"], item["payload"]["end"])
+            AudioBuffer(shard.data * gain / 0.5, shard.sample_rate).write(path, subtype="FLOAT")
+            processor.queue.complete(item["id"], "worker", {"path": os.path.relpath(path, self.job_path), "peak": gain})
+        self.assertIsNone(processor.queue.claim("worker", job=job))
+
+    def test_normalization_uses_the_peak_of_the_whole_audio(self):
+        processor = DistributedProcessor(self.job_path)
+        job = processor.submit(self.input_path, "test", shard_seconds=4, search_seconds=1, stages=("enhance",))
+        self.assertEqual(self._payloads(job)[0]["post_stages"], ["normalize"])
+        self._complete_with_gains(processor, job, (0.2, 0.4, 0.3, 0.1, 0.25))
+
+        # La unión conserva los niveles relativos de cada fragmento y lleva el pico global a 1
+        merged = AudioBuffer.from_file(processor.merge(job, os.path.join(self.temp_path, "merged")))
+        self.assertAlmostEqual(float(np.abs(merged.data).max()), 1.0, places=3)
+        self.assertAlmostEqual(float(np.abs(merged.data[0, SAMPLE_RATE:2 * SAMPLE_RATE]).max()), 0.5, places=3)
+
+    def test_silence_is_removed_after_merge(self):
+        processor = DistributedProcessor(self.job_path)
+        job = processor.submit(self.input_path, "test", shard_seconds=4, search_seconds=1, stages=("voice", "noise", "silence", "enhance"))
+        payloads = self._payloads(job)
+        self.assertEqual(payloads[0]["stages"], ["voice", "noise", "enhance"])
+        self.assertEqual(payloads[0]["post_stages"], ["silence", "normalize"])
+        self._complete_with_gains(processor, job, (0.5,) * len(payloads))
+
+        # La calibración de SilenceRemover se guarda en el directorio temporal y no en la del usuario
+        defaults = (None, 0.7, os.path.join(self.temp_path, "autotune.json"))
+        with mock.patch.object(ParallelAutoTuner.__init__, "__defaults__", defaults):
+            merged_path = processor.merge(job, os.path.join(self.temp_path, "merged"))
+        merged = AudioBuffer.from_file(merged_path)
+        # Se eliminan las cinco pausas de 0.5 segundos salvo los márgenes que conserva SilenceRemover
+        self.assertLess(merged.duration, 18)
+        self.assertAlmostEqual(float(np.abs(merged.data).max()), 1.0, places=3)
+        self.assertEqual(os.listdir(os.path.join(self.temp_path, "merged")), [os.path.basename(merged_path)])
+
+    def test_submit_creates_a_new_job_each_time(self):
+        processor = DistributedProcessor(self.job_path)
+        first = processor.submit(self.input_path, "test", shard_seconds=4, stages=())
+        second = processor.submit(self.input_path, "test", shard_seconds=4, stages=())
+        self.assertNotEqual(first, second)
+        self.assertEqual(len(processor.queue.results(first)), len(processor.queue.results(second)))
+
+    def test_submit_with_short_shards(self):
+        processor = DistributedProcessor(self.job_path)
+        job = processor.submit(self.input_path, "test", shard_seconds=2, search_seconds=5, stages=())
+        self.assertIsNotNone(job)
+        starts = [payload["start"] for payload in self._payloads(job)]
+        self.assertEqual(starts, sorted(starts))
+        self.assertTrue(all(later - earlier >= 1 for earlier, later in zip(starts[:-1], starts[1:])))
+        self.assertIsNone(processor.submit(self.input_path, "test", shard_seconds=0, stages=()))
+
+class WorkQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_path = tempfile.mkdtemp()
+        self.queue = WorkQueue(os.path.join(self.temp_path, "queue.sqlite"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_path)
+
+    def test_expired_lease_stops_after_max_attempts(self):
+        self.queue.enqueue("job", [{}])
+        for attempt in range(2):
+            self.assertIsNotNone(self.queue.claim(f"worker{attempt}", 0, max_attempts=2))
+            time.sleep(0.01)
+        # El arriendo expiró tras el último intento: el elemento queda como fallido
+        self.assertIsNone(self.queue.claim("worker2", 0, max_attempts=2))
+        self.assertEqual(self.queue.status("job"), {"failed": 1})
+
+if __name__ == "__main__":
+    unittest.main()
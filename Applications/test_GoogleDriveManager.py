@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+import unittest
+from Applications.GoogleDriveManager import GoogleDriveManager, FOLDER_MIME_TYPE
+from Applications.LocalDriveBackend import LocalDriveBackend
+
+class GoogleDriveManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_path = tempfile.mkdtemp()
+        self.backend = LocalDriveBackend(os.path.join(self.temp_path, "drive"))
+        self.manager = GoogleDriveManager(drive=self.backend, page_size=2)
+        self.local_path = os.path.join(self.temp_path, "local")
+        os.makedirs(self.local_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_path)
+
+    def _write(self, name, content):
+        path = os.path.join(self.local_path, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_create_folder_reuses_cached_ids(self):
+        folder_id = self.manager.create_folder("/Demiset/a/b")
+        self.assertEqual(self.manager.create_folder("Demiset/a/b"), folder_id)
+        # Solo debe existir una carpeta por nivel
+        folders = [item for item in self.backend.files.values() if item["mimeType"] == FOLDER_MIME_TYPE]
+        self.assertEqual(len(folders), 3)
+
+    def test_remember_updates_cached_listing(self):
+        folder_id = self.manager.create_folder("Demiset")
+        # Poblar la caché del listado antes de subir
+        self.assertEqual(self.manager._list_folder(folder_id, is_folder=False), [])
+        self.manager.upload_files([self._write(f"f{i}.txt", "x" * (i + 1)) for i in range(3)], "Demiset")
+
+        titles = sorted(item["title"] for item in self.manager._list_folder(folder_id, is_folder=False))
+        self.assertEqual(titles, ["f0.txt", "f1.txt", "f2.txt"])
+        self.assertIsNotNone(self.manager.get_folder_or_file_id("f1.txt", folder_id, is_folder=False))
+
+    def test_forget_invalidates_deleted_folder(self):
+        parent_id = self.manager.create_folder("Demiset")
+        folder_id = self.manager.upload_file(self._write("f.txt", "x"), "Demiset/job")
+        self.assertEqual(self.manager.get_folder_or_file_id("job", parent_id), folder_id)
+
+        self.assertTrue(self.manager.delete_folder(folder_id))
+        self.assertIsNone(self.manager.get_folder_or_file_id("job", parent_id))
+        self.assertEqual(self.manager._list_folder(folder_id), [])
+        self.assertNotIn(folder_id, [item["id"] for item in self.manager._list_folder(parent_id)])
+
+    def test_upload_skips_file_with_same_name_and_size(self):
+        path = self._write("f.txt", "abc")
+        self.manager.upload_file(path, "Demiset")
+        self.manager.upload_file(path, "Demiset")
+        self.assertEqual(len(self.backend.files), 2)  # Carpeta y un único archivo
+
+        # Con otro tamaño sí se vuelve a subir
+        self._write("f.txt", "abcd")
+        self.manager.upload_file(path, "Demiset")
+        self.assertEqual(len(self.backend.files), 3)
+
+    def test_download_skips_complete_files_and_resumes_partial(self):
+        self.manager.chunksize = 2
+        folder_id = self.manager.upload_files([self._write("a.txt", "aaa"), self._write("b.txt", "bcdef")], "Demiset")
+        archivo_list = self.manager._list_folder(folder_id, is_folder=False)
+        download_path = os.path.join(self.temp_path, "download")
+        os.makedirs(download_path)
+
+        # a.txt ya está completo y no se vuelve a descargar; b.txt quedó a medias en su ".part"
+        with open(os.path.join(download_path, "a.txt"), "w") as f:
+            f.write("zzz")
+        with open(os.path.join(download_path, "b.txt.part"), "w") as f:
+            f.write("b")
+
+        self.manager.download_files(archivo_list, download_path)
+        with open(os.path.join(download_path, "a.txt")) as f:
+            self.assertEqual(f.read(), "zzz")
+        with open(os.path.join(download_path, "b.txt")) as f:
+            self.assertEqual(f.read(), "bcdef")
+        self.assertFalse(any(name.endswith(".part") for name in os.listdir(download_path)))
+        # Solo se pidieron los bytes que faltaban, por bloques de chunksize
+        self.assertEqual([headers['range'] for headers in self.backend.auth.http.requests], ["bytes=1-2", "bytes=3-4"])
+
+    def test_listing_is_refreshed_after_ttl(self):
+        folder_id = self.manager.upload_file(self._write("a.txt", "a"), "Demiset")
+        # Un archivo subido a Drive desde fuera de esta instancia
+        other = GoogleDriveManager(drive=self.backend)
+        other.upload_file(self._write("b.txt", "b"), "Demiset")
+
+        self.assertEqual(len(self.manager._list_folder(folder_id, is_folder=False)), 1)
+        self.assertEqual(len(self.manager._list_folder(folder_id, is_folder=False, refresh=True)), 2)
+        self.manager.listing_ttl = 0
+        other.delete_file(other.get_folder_or_file_id("b.txt", folder_id, is_folder=False))
+        self.assertEqual(len(self.manager._list_folder(folder_id, is_folder=False)), 1)
+        self.assertIsNone(self.manager.get_folder_or_file_id("b.txt", folder_id, is_folder=False))
+
+if __name__ == "__main__":
+    unittest.main()
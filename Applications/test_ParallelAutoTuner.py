@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from Applications.ParallelAutoTuner import ParallelAutoTuner
+
+class ParallelAutoTunerTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_path = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.temp_path, "autotune.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_path)
+
+    def _tuner(self, max_workers=8):
+        tuner = ParallelAutoTuner("stage", cache_path=self.cache_path)
+        # Simular un host con max_workers núcleos
+        tuner.cpu_count = tuner.max_workers = max_workers
+        return tuner
+
+    def _calibrate(self, tuner, seconds_per_audio_second=0.01):
+        for length in tuner.CALIBRATION_SECONDS:
+            tuner.samples.append((length, length * seconds_per_audio_second, 0))
+
+    def test_short_input_does_not_save_unmeasured_scaling(self):
+        tuner = self._tuner()
+        self._calibrate(tuner)
+        self.assertEqual(tuner.tune(15)["num_workers"], 1)
+        self.assertIsNone(self._tuner().load())
+
+        # La siguiente entrada, suficientemente larga, se calibra con la medición concurrente
+        tuner = self._tuner()
+        self._calibrate(tuner)
+        tuner.measure_concurrent(lambda segment: time.sleep(0.1), range(4), 10)
+        params = tuner.tune(600)
+        self.assertGreater(params["num_workers"], 1)
+        self.assertEqual(self._tuner().load()["num_workers"], params["num_workers"])
+
+    def test_contention_limits_workers(self):
+        tuner = self._tuner()
+        self._calibrate(tuner, 0.01)
+        # Cuatro segmentos de 10 s a la vez tardan lo mismo que en serie: la etapa no escala
+        tuner.concurrent_sample = (4, 10, 0.4)
+        params = tuner.tune(600)
+        self.assertAlmostEqual(params["contention"], 1.0)
+        self.assertEqual(params["num_workers"], 1)
+
+    def test_single_worker_stage_is_saved_without_concurrent_measurement(self):
+        tuner = self._tuner(max_workers=1)
+        self._calibrate(tuner)
+        tuner.tune(15)
+        self.assertIsNotNone(self._tuner(max_workers=1).load())
+
+if __name__ == "__main__":
+    unittest.main()
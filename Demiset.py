@@ -1,48 +1,144 @@
+import argparse
 import os
 import time
-import matplotlib.pyplot as plt
-from Applications.AudioProcessing import AudioProcessing
-from Applications.NoiseReducer import NoiseReducer
-from Applications.RemoteFileDownloader import RemoteFileDownloader
-from Applications.SilenceRemover import SilenceRemover
-from Applications.VoiceExtractor import VoiceExtractor
-from Applications.Zipper import Zipper
 import zipfile
 
-def main():
-    input_folder = "Test"
-    input_url = 'https://www.youtube.com/watch?v=RzJ3QjBsqM0'
-    output_folder = "Test\Outputs"
-    noise_threshold = 50 
-    ms_split = 15000 
-    enhance_audio = True
-        
-    remote_file_downloader = RemoteFileDownloader()
-    audio_processing = AudioProcessing()
-    noise_reducer = NoiseReducer()
-    voice_extractor = VoiceExtractor()
-    silence_remover = SilenceRemover()
-    zipper = Zipper()
+# Las etapas se importan dentro de main() para que "--help" y las descargas no carguen torch, demucs ni librerías de audio
+
+def positive_float(value):
+    number = float(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"debe ser un número positivo: {value}")
+    return number
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un dataset de audio a partir de archivos locales o remotos.")
+    parser.add_argument("--input-folder", default="Test", help="Carpeta con los audios de entrada y destino de la descarga.")
+    parser.add_argument("--input-url", default="https://www.youtube.com/watch?v=RzJ3QjBsqM0", help="URL remota a descargar. Vacío para usar solo la carpeta de entrada.")
+    parser.add_argument("--output-folder", default=os.path.join("Test", "Outputs"), help="Carpeta de salida.")
+    parser.add_argument("--noise-threshold", type=int, default=50, help="Porcentaje de reducción de ruido (0 lo desactiva).")
+    parser.add_argument("--ms-split", type=int, default=15000, help="Duración objetivo de cada segmento en milisegundos.")
+    parser.add_argument("--no-smart-split", dest="smart_split", action="store_false", help="Cortar en límites fijos en lugar de en las pausas.")
+    parser.add_argument("--no-enhance-audio", dest="enhance_audio", action="store_false", help="No aplicar la mejora de audio.")
+    parser.add_argument("--download-only", action="store_true", help="Solo descargar el archivo remoto.")
+    parser.add_argument("--no-plot", dest="plot", action="store_false", help="No mostrar el gráfico de tiempos.")
+    parser.add_argument("--role", choices=["local", "coordinator", "worker"], default="local", help="Procesar en este equipo, coordinar un trabajo repartido o ejecutar un trabajador.")
+    parser.add_argument("--job-path", default=os.path.join("Test", "Job"), help="Directorio compartido del trabajo repartido.")
+    parser.add_argument("--shard-seconds", type=positive_float, default=600, help="Duración aproximada de cada fragmento del trabajo repartido.")
+    parser.add_argument("--local-workers", type=int, default=0, help="Trabajadores locales que lanza el coordinador.")
+    parser.add_argument("--job-timeout", type=positive_float, default=24 * 3600, help="Segundos máximos que el coordinador espera a que terminen los fragmentos.")
+    parser.add_argument("--worker-idle-timeout", type=float, default=0, help="Segundos que un trabajador espera trabajo nuevo antes de terminar.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.role == "worker":
+        from Applications.DistributedProcessor import DistributedProcessor
+        processed = DistributedProcessor(args.job_path).run_worker(idle_timeout=args.worker_idle_timeout)
+        print(f"Fragmentos procesados: {processed}")
+        return
+
+    input_folder = args.input_folder
+    input_url = args.input_url
+    output_folder = args.output_folder
+    ms_split = args.ms_split
+    smart_split = args.smart_split
 
     # Diccionario para almacenar los tiempos de cada paso
     tiempo_por_paso = {}
 
-    start_time = time.time()
-    # Descargar archivo remoto
-    ruta_archivo_descargado = remote_file_downloader.download(input_url, input_folder)
-    if ruta_archivo_descargado.endswith('.zip'):
-        # Obtener la ruta del directorio donde se extraerá el archivo ZIP
-        output_directory = os.path.dirname(ruta_archivo_descargado)
-        # Extraer el archivo ZIP en el mismo directorio
-        with zipfile.ZipFile(ruta_archivo_descargado, 'r') as zip_ref:
-            zip_ref.extractall(output_directory)
-    tiempo_por_paso["Descarga remota"] = time.time() - start_time
-    
+    if input_url:
+        from Applications.RemoteFileDownloader import RemoteFileDownloader
+        remote_file_downloader = RemoteFileDownloader()
+
+        start_time = time.time()
+        # Descargar archivo remoto
+        ruta_archivo_descargado = remote_file_downloader.download(input_url, input_folder)
+        if ruta_archivo_descargado.endswith('.zip'):
+            # Obtener la ruta del directorio donde se extraerá el archivo ZIP
+            output_directory = os.path.dirname(ruta_archivo_descargado)
+            # Extraer el archivo ZIP en el mismo directorio
+            with zipfile.ZipFile(ruta_archivo_descargado, 'r') as zip_ref:
+                zip_ref.extractall(output_directory)
+        tiempo_por_paso["Descarga remota"] = time.time() - start_time
+
+    if args.download_only:
+        return
+
+    from Applications.AudioProcessing import AudioProcessing
+    from Applications.Zipper import Zipper
+
+    audio_processing = AudioProcessing()
+    zipper = Zipper()
+
     start_time = time.time()
     # Combinar todos los audios en un solo archivo
     ruta_audio_combinado = audio_processing.combine_audio(input_folder, output_folder)
     tiempo_por_paso["Combinación de audio"] = time.time() - start_time
 
+    if args.role == "coordinator":
+        ruta_audio_mejorado = run_distributed(args, ruta_audio_combinado, tiempo_por_paso)
+    else:
+        ruta_audio_mejorado = run_local(args, audio_processing, ruta_audio_combinado, tiempo_por_paso)
+    if ruta_audio_mejorado is None:
+        print("No se pudo procesar el audio combinado.")
+        return
+
+    start_time = time.time()
+    # Dividir archivo en audios de 15 segundos
+    output_folder_dataset = os.path.join(output_folder, "dataset")
+    ruta_audio_dividido = audio_processing.split_audio(ruta_audio_mejorado, output_folder_dataset, ms_split, smart=smart_split)
+    tiempo_por_paso["División de audio"] = time.time() - start_time
+
+    start_time = time.time()
+    # Comprimir dataset en un zip
+    ruta_dataset_comprimido = zipper.zip_files(ruta_audio_dividido, "dataset.zip")
+    tiempo_por_paso["Compresión de dataset"] = time.time() - start_time
+
+    if args.plot:
+        import matplotlib.pyplot as plt
+        # Mostrar el gráfico
+        plt.figure(figsize=(10, 6))
+        plt.bar(tiempo_por_paso.keys(), tiempo_por_paso.values(), color='skyblue')
+        plt.xlabel('Proceso')
+        plt.ylabel('Tiempo (segundos)')
+        plt.title('Tiempo de ejecución por procesos')
+        plt.xticks(rotation=45)
+        plt.tight_layout()
+        plt.show()
+
+def run_distributed(args, ruta_audio_combinado, tiempo_por_paso):
+    from Applications.DistributedProcessor import DistributedProcessor, run_local_workers
+
+    start_time = time.time()
+    # Repartir la extracción de voz, la reducción de ruido, la eliminación de silencios y la mejora entre los trabajadores
+    stages = ["voice", "noise", "silence"] + (["enhance"] if args.enhance_audio else [])
+    name = os.path.splitext(os.path.basename(ruta_audio_combinado))[0]
+    distributed_processor = DistributedProcessor(args.job_path)
+    job = distributed_processor.submit(ruta_audio_combinado, name, args.shard_seconds, stages=stages, noise_threshold=args.noise_threshold)
+    if job is None:
+        return None
+    if args.local_workers > 0:
+        run_local_workers(args.job_path, args.local_workers, job)
+    if not distributed_processor.wait(job, timeout=args.job_timeout):
+        print(f"El trabajo {job} no terminó: {distributed_processor.queue.status(job)}")
+        return None
+    ruta_audio_procesado = distributed_processor.merge(job, args.output_folder)
+    tiempo_por_paso["Procesamiento repartido"] = time.time() - start_time
+    return ruta_audio_procesado
+
+def run_local(args, audio_processing, ruta_audio_combinado, tiempo_por_paso):
+    from Applications.NoiseReducer import NoiseReducer
+    from Applications.SilenceRemover import SilenceRemover
+    from Applications.VoiceExtractor import VoiceExtractor
+
+    output_folder = args.output_folder
+    noise_threshold = args.noise_threshold
+    enhance_audio = args.enhance_audio
+    noise_reducer = NoiseReducer()
+    voice_extractor = VoiceExtractor()
+    silence_remover = SilenceRemover()
+
     start_time = time.time()
     # Extraer la voz del audio
     ruta_audio_voz = voice_extractor.extract_vocals(ruta_audio_combinado, output_folder)
@@ -55,7 +151,7 @@ def main():
         tiempo_por_paso["Reducción de ruido"] = time.time() - start_time
     else:
         ruta_audio_sin_ruido = ruta_audio_voz
-        
+
     start_time = time.time()
     # Eliminar silencios del audio procesado
     ruta_sin_silencio = silence_remover.remove_silence(ruta_audio_sin_ruido, output_folder)
@@ -70,26 +166,7 @@ def main():
     else:
         ruta_audio_mejorado = ruta_sin_silencio
 
-    start_time = time.time()
-    # Dividir archivo en audios de 15 segundos
-    output_folder_dataset = os.path.join(output_folder, "dataset")
-    ruta_audio_dividido = audio_processing.split_audio(ruta_audio_mejorado, output_folder_dataset, ms_split)
-    tiempo_por_paso["División de audio"] = time.time() - start_time
-
-    start_time = time.time()
-    # Comprimir dataset en un zip
-    ruta_dataset_comprimido = zipper.zip_files(ruta_audio_dividido, "dataset.zip")
-    tiempo_por_paso["Compresión de dataset"] = time.time() - start_time
-
-    # Mostrar el gráfico
-    plt.figure(figsize=(10, 6))
-    plt.bar(tiempo_por_paso.keys(), tiempo_por_paso.values(), color='skyblue')
-    plt.xlabel('Proceso')
-    plt.ylabel('Tiempo (segundos)')
-    plt.title('Tiempo de ejecución por procesos')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.show()
+    return ruta_audio_mejorado
 
 if __name__ == "__main__":
     main()
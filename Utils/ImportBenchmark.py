@@ -0,0 +1,78 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+# Mide la latencia de arranque: cada módulo se importa en un intérprete nuevo para no reutilizar la caché de sys.modules
+MODULES = [
+    "Demiset",
+    "Applications.AudioProcessing",
+    "Applications.ParallelAudioProcessor",
+    "Applications.NoiseReducer",
+    "Applications.SilenceRemover",
+    "Applications.VoiceExtractor",
+    "Applications.RemoteFileDownloader",
+    "Applications.GoogleDriveManager",
+]
+
+RUTA_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def measure_import(module, repeat=3):
+    """
+    Mide el tiempo de importación de un módulo en un proceso nuevo.
+
+    Args:
+        module (str): Nombre del módulo a importar.
+        repeat (int): Número de repeticiones; se devuelve la mínima.
+
+    Returns:
+        float or None: Tiempo de importación en segundos, None si el módulo no se pudo importar.
+    """
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    timings = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", code], cwd=RUTA_PROYECTO, capture_output=True, text=True)
+        if result.returncode != 0:
+            return None
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return min(timings)
+
+def measure_help(repeat=3):
+    """
+    Mide el tiempo total de "python Demiset.py --help", incluido el arranque del intérprete.
+
+    Args:
+        repeat (int): Número de repeticiones; se devuelve la mínima.
+
+    Returns:
+        float: Tiempo en segundos.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "Demiset.py", "--help"], cwd=RUTA_PROYECTO, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el tiempo de importación de los módulos de Demiset.")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por módulo.")
+    parser.add_argument("--history", help="Archivo JSON Lines donde añadir los resultados para seguir su evolución.")
+    args = parser.parse_args()
+
+    results = {"timestamp": time.time(), "python": platform.python_version(), "help": measure_help(args.repeat), "modules": {}}
+    print(f"{'Demiset.py --help':<40} {results['help']:.3f} s")
+    for module in MODULES:
+        elapsed = measure_import(module, args.repeat)
+        results["modules"][module] = elapsed
+        print(f"{module:<40} {'no disponible' if elapsed is None else f'{elapsed:.3f} s'}")
+
+    if args.history:
+        with open(args.history, "a") as f:
+            f.write(json.dumps(results) + "\n")
+
+if __name__ == "__main__":
+    main()